@@ -0,0 +1,54 @@
+"""Tempo di import del nucleo di calcolo.
+
+    python benchmarks/bench_import.py [--ripetizioni 15] [--budget-ms 10]
+
+Esegue `import pk4` in processi puliti con -X importtime, riporta la mediana del tempo
+cumulativo del pacchetto e termina con errore se supera il budget o se carica tkinter.
+Gli stessi controlli (con un budget più largo) girano con pytest in tests/test_import.py.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+RADICE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_CODICE = (
+    "import pk4, sys\n"
+    "pk4.breakdown_costo(pk4.DEFAULT_PARAMETRI, 100, 100, 1, 1, 0)\n"
+    "print(sorted(m for m in ('tkinter', '_tkinter') if m in sys.modules))\n"
+)
+
+def misura_import():
+    """Un import pulito: (ms cumulativi di pk4, moduli GUI caricati)."""
+    r = subprocess.run([sys.executable, "-X", "importtime", "-c", _CODICE], cwd=RADICE,
+                       capture_output=True, text=True, check=True)
+    us = None
+    for riga in r.stderr.splitlines():
+        parti = [p.strip() for p in riga.split("|")]
+        if len(parti) == 3 and parti[2] == "pk4":
+            us = int(parti[1])
+    if us is None: raise RuntimeError("Riga di importtime per 'pk4' non trovata.")
+    return us / 1000.0, r.stdout.strip()
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--ripetizioni", type=int, default=15)
+    ap.add_argument("--budget-ms", type=float, default=10.0)
+    args = ap.parse_args(argv)
+
+    tempi = []; gui = "[]"
+    for _ in range(args.ripetizioni):
+        ms, gui = misura_import(); tempi.append(ms)
+    mediana = statistics.median(tempi)
+    print(f"import pk4: mediana {mediana:.2f} ms, min {min(tempi):.2f} ms, max {max(tempi):.2f} ms"
+          f" ({args.ripetizioni} processi)")
+    esito = 0
+    if gui != "[]":
+        print(f"ERRORE: l'import del nucleo carica la GUI: {gui}", file=sys.stderr); esito = 1
+    if mediana > args.budget_ms:
+        print(f"ERRORE: mediana oltre il budget di {args.budget_ms:.1f} ms", file=sys.stderr); esito = 1
+    return esito
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,15 @@
+"""PrintK: calcolo dei costi di stampa.
+
+`import pk4` carica solo il nucleo di calcolo (nessun tkinter); la GUI in pk4.gui viene
+importata al primo accesso a pk4.App.
+"""
+from .core import (APP_TITLE, DEFAULT_PARAMETRI, PERCORSO_FILE_CONFIG, breakdown_costo, carica_parametri,
+                   eur, format_it, salva_parametri, valida_lavoro)
+from .risultati import (CAMPI_RISULTATO, COLONNE_TABELLA, DIPENDENZE_PARAMETRI, Preventivo, RigaPreventivo,
+                        TabellaPreventivi, formatta_impatto, parametri_cambiati, preventivo, riprezza_tabella)
+
+def __getattr__(nome):
+    if nome == "App":
+        from .gui import App
+        return App
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
@@ -0,0 +1,147 @@
+"""Test di carico dei preventivi: throughput e latenze p50/p95/p99 al crescere della concorrenza.
+
+Il bersaglio è il calcolo in-process (preventivo) oppure un front end HTTP locale che accetta
+in POST un ticket JSON come quelli della cartella calda. I lavori vengono da un profilo
+sintetico o da un catalogo .pk4c storico. I risultati si salvano in JSON per confrontare le esecuzioni.
+"""
+import json
+import math
+import os
+import platform
+import random
+import time
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import cycle
+
+from .core import format_it
+from .risultati import preventivo
+
+# Profili sintetici: misure in mm (log-normale), quantità e livelli con pesi.
+PROFILI = {
+    "misto": {"lung_mm": (5.8, 0.7), "larg_mm": (5.3, 0.6),
+              "quantita": ((1, 5, 10, 25, 50, 100, 500), (10, 15, 20, 20, 15, 15, 5)),
+              "cmyk_level": ((0, 1, 2, 3, 4), (5, 50, 25, 15, 5)), "w_level": ((0, 1, 2, 3), (60, 25, 10, 5))},
+    "piccoli": {"lung_mm": (4.6, 0.4), "larg_mm": (4.3, 0.4),
+                "quantita": ((50, 100, 250, 500, 1000), (20, 30, 25, 15, 10)),
+                "cmyk_level": ((1, 2), (80, 20)), "w_level": ((0, 1), (70, 30))},
+    "grandi": {"lung_mm": (7.2, 0.4), "larg_mm": (6.8, 0.4),
+               "quantita": ((1, 2, 5, 10), (40, 30, 20, 10)),
+               "cmyk_level": ((1, 2, 3, 4, 5, 6), (20, 30, 20, 15, 10, 5)), "w_level": ((0, 1, 2, 3), (30, 40, 20, 10))},
+}
+
+def lavori_sintetici(profilo, n, seme=0):
+    """n lavori (lung_mm, larg_mm, quantita, cmyk_level, w_level) estratti da un profilo di PROFILI."""
+    p = PROFILI[profilo] if isinstance(profilo, str) else profilo
+    rng = random.Random(seme)
+    def misura(mu_sigma): return round(min(5000.0, max(10.0, rng.lognormvariate(*mu_sigma))), 1)
+    q = rng.choices(*p["quantita"], k=n); c = rng.choices(*p["cmyk_level"], k=n); w = rng.choices(*p["w_level"], k=n)
+    return [(misura(p["lung_mm"]), misura(p["larg_mm"]), q[i], c[i], w[i]) for i in range(n)]
+
+def lavori_da_catalogo(percorso, n, seme=0):
+    """n lavori campionati (con ripetizione) da un catalogo .pk4c, per riprodurre il mix reale."""
+    from .catalogo import CatalogoMappato
+    rng = random.Random(seme)
+    with CatalogoMappato(percorso) as cat:
+        if not cat.righe: raise ValueError(f"{percorso}: catalogo vuoto.")
+        c = cat.colonne
+        return [(c["lung_mm"][i], c["larg_mm"][i], c["quantita"][i], c["cmyk_level"][i], c["w_level"][i])
+                for i in (rng.randrange(cat.righe) for _ in range(n))]
+
+def _chiamata(bersaglio):
+    """Bersaglio (tupla serializzabile, va anche ai processi) -> funzione che prezza un lavoro."""
+    if bersaglio[0] == "inprocess":
+        parametri = bersaglio[1]
+        return lambda lav: preventivo(parametri, *lav)
+    if bersaglio[0] == "http":
+        url, timeout = bersaglio[1], bersaglio[2]
+        def chiama(lav):
+            corpo = json.dumps(dict(zip(("lung_mm", "larg_mm", "quantita", "cmyk_level", "w_level"), lav))).encode()
+            req = urllib.request.Request(url, data=corpo, headers={"Content-Type": "application/json"})
+            with urllib.request.urlopen(req, timeout=timeout) as r: r.read()
+        return chiama
+    raise ValueError(f"Bersaglio sconosciuto: {bersaglio[0]}")
+
+def _lavoratore(bersaglio, lavori, scadenza):
+    """Esegue i lavori in sequenza (in ciclo fino alla scadenza, se data); restituisce (latenze ns, errori)."""
+    chiama = _chiamata(bersaglio); latenze = []; errori = 0
+    orologio = time.perf_counter_ns
+    for lav in (lavori if scadenza is None else cycle(lavori)):
+        if scadenza is not None and time.time() >= scadenza: break
+        t0 = orologio()
+        try: chiama(lav)
+        except Exception: errori += 1; continue
+        latenze.append(orologio() - t0)
+    return latenze, errori
+
+def percentile(ordinati, p):
+    """Percentile nearest-rank su una lista già ordinata."""
+    if not ordinati: return 0.0
+    return ordinati[max(0, math.ceil(p / 100.0 * len(ordinati)) - 1)]
+
+def esegui_livello(bersaglio, lavori, concorrenza, durata_s=None, processi=False):
+    """Un gradino della rampa: `concorrenza` lavoratori che si dividono `lavori`."""
+    fette = [lavori[i::concorrenza] for i in range(concorrenza)]
+    Esecutore = ProcessPoolExecutor if processi else ThreadPoolExecutor
+    with Esecutore(max_workers=concorrenza) as ex:
+        if processi:  # avvia i processi prima di misurare
+            list(ex.map(_lavoratore, [bersaglio] * concorrenza, [[]] * concorrenza, [None] * concorrenza))
+        t0 = time.perf_counter(); scadenza = (time.time() + durata_s) if durata_s else None
+        esiti = list(ex.map(_lavoratore, [bersaglio] * concorrenza, fette, [scadenza] * concorrenza))
+        durata = time.perf_counter() - t0
+    latenze = sorted(x for lat, _ in esiti for x in lat); errori = sum(e for _, e in esiti)
+    ms = lambda ns: ns / 1e6
+    return {
+        "concorrenza": concorrenza, "richieste": len(latenze), "errori": errori, "durata_s": durata,
+        "throughput_rps": len(latenze) / durata if durata > 0 else 0.0,
+        "p50_ms": ms(percentile(latenze, 50)), "p95_ms": ms(percentile(latenze, 95)),
+        "p99_ms": ms(percentile(latenze, 99)), "max_ms": ms(latenze[-1]) if latenze else 0.0,
+    }
+
+def esegui_rampa(bersaglio, lavori, livelli=(1, 2, 4, 8), richieste=2000, durata_s=None, processi=False,
+                 descrizione=""):
+    """Rampa di concorrenza: per ogni livello `richieste` chiamate (o fino a `durata_s` secondi)."""
+    risultati = []
+    for livello in livelli:
+        blocco = lavori if durata_s else (lavori * (richieste // len(lavori) + 1))[:richieste]
+        risultati.append(esegui_livello(bersaglio, blocco, livello, durata_s, processi))
+    return {
+        "data": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "bersaglio": bersaglio[0] if bersaglio[0] == "inprocess" else bersaglio[1],
+        "descrizione": descrizione, "processi": processi,
+        "ambiente": {"python": platform.python_version(), "sistema": platform.platform(), "cpu": os.cpu_count()},
+        "livelli": risultati,
+    }
+
+def salva_risultati(esito, cartella):
+    """Salva in un file nuovo (AAAAMMGG-HHMMSS[-n].json): due esecuzioni nello stesso secondo non si sovrascrivono."""
+    os.makedirs(cartella, exist_ok=True)
+    base = time.strftime("%Y%m%d-%H%M%S")
+    for n in range(1, 10000):
+        percorso = os.path.join(cartella, base + (f"-{n}" if n > 1 else "") + ".json")
+        try: f = open(percorso, "x", encoding="utf-8")  # creazione esclusiva, anche tra processi
+        except FileExistsError: continue
+        with f: json.dump(esito, f, indent=2, ensure_ascii=False)
+        return percorso
+    raise FileExistsError(f"{cartella}: troppi risultati con data {base}.")
+
+def formatta_rampa(esito):
+    righe = [f"{'conc.':>6} {'rich.':>9} {'err.':>6} {'rich/s':>11} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"]
+    for r in esito["livelli"]:
+        righe.append(f"{r['concorrenza']:>6} {format_it(r['richieste'], 0):>9} {r['errori']:>6} "
+                     f"{format_it(r['throughput_rps'], 0):>11} {format_it(r['p50_ms'], 3):>9} "
+                     f"{format_it(r['p95_ms'], 3):>9} {format_it(r['p99_ms'], 3):>9}")
+    return "\n".join(righe)
+
+def confronta_rampe(prima, dopo):
+    """Variazione % di throughput e p99 per i livelli di concorrenza presenti in entrambe le esecuzioni."""
+    base = {r["concorrenza"]: r for r in prima["livelli"]}
+    righe = [f"{'conc.':>6} {'rich/s':>18} {'p99 ms':>18}"]
+    for r in dopo["livelli"]:
+        b = base.get(r["concorrenza"])
+        if b is None: continue
+        var = lambda nuovo, vecchio: f"{'+' if nuovo >= vecchio else ''}{format_it((nuovo / vecchio - 1) * 100, 1)}%" \
+            if vecchio else "n/d"
+        righe.append(f"{r['concorrenza']:>6} {var(r['throughput_rps'], b['throughput_rps']):>18} "
+                     f"{var(r['p99_ms'], b['p99_ms']):>18}")
+    return "\n".join(righe)
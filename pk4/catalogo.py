@@ -0,0 +1,243 @@
+"""Catalogo binario .pk4c mappato in memoria e convertitori CSV."""
+import csv
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from .core import DEFAULT_PARAMETRI, _to_float, valida_lavoro
+from .risultati import (COLONNE_TABELLA, TabellaPreventivi, _COMPONENTI_COSTO, _NOMI_COLONNE,
+                        _somma_per_quantita, riprezza_tabella)
+
+# =============================== CATALOGO BINARIO ===============================
+
+# Formato .pk4c: header fisso, schema JSON, poi una colonna contigua per campo (allineata a 8 byte).
+CATALOGO_MAGIC = b"PK4C"
+CATALOGO_VERSIONE = 1
+_HEADER_CATALOGO = struct.Struct("<4sBBHQ32sI")  # magic, versione, little-endian, riservato, righe, impronta, len schema
+_OFFSET_IMPRONTA = 16
+
+COLONNE_LAVORO = (
+    ("lung_mm", "d"), ("larg_mm", "d"), ("quantita", "I"), ("cmyk_level", "B"), ("w_level", "B"),
+)
+# Catalogo prezzato: dimensioni + colonne di TabellaPreventivi (quantità e livelli non duplicati).
+COLONNE_CATALOGO_PREZZATO = COLONNE_LAVORO[:2] + COLONNE_TABELLA
+_NOMI_LAVORO = frozenset(nome for nome, _ in COLONNE_LAVORO)
+_RIGHE_PER_BLOCCO = 65536
+
+def impronta_parametri(parametri):
+    """Impronta (32 caratteri hex) dei parametri che determinano i prezzi."""
+    dati = json.dumps({k: float(parametri.get(k, v)) for k, v in DEFAULT_PARAMETRI.items()}, sort_keys=True)
+    return hashlib.sha256(dati.encode("utf-8")).hexdigest()[:32]
+
+def _allinea(n, a=8):
+    return (n + a - 1) // a * a
+
+def _inizio_dati(len_schema):
+    return _allinea(_HEADER_CATALOGO.size + len_schema)
+
+def _crea_file_catalogo(percorso, colonne, righe, impronta=""):
+    """Crea un catalogo della dimensione finale (colonne a zero) pronto per essere mappato."""
+    schema = []; pos = 0  # offset relativi all'inizio dei dati
+    for nome, tipo in colonne:
+        size = array(tipo).itemsize
+        schema.append([nome, tipo, pos, size]); pos = _allinea(pos + size * righe)
+    blob = json.dumps({"colonne": schema}).encode("utf-8")
+    with open(percorso, "wb") as f:
+        f.write(_HEADER_CATALOGO.pack(CATALOGO_MAGIC, CATALOGO_VERSIONE, sys.byteorder == "little", 0,
+                                      righe, impronta.encode("ascii"), len(blob)))
+        f.write(blob)
+        f.truncate(_inizio_dati(len(blob)) + pos)
+
+class CatalogoMappato:
+    """Catalogo .pk4c aperto via mmap: le colonne sono memoryview sulle pagine del file (nessuna copia)."""
+
+    def __init__(self, percorso, scrittura=False):
+        self.percorso = percorso; self.scrittura = scrittura
+        self._impronta_memoria = None  # impronta dei prezzi ricalcolati in memoria (catalogo in sola lettura)
+        self._f = open(percorso, "r+b" if scrittura else "rb")
+        try:
+            self._mm = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_WRITE if scrittura else mmap.ACCESS_READ)
+        except ValueError:
+            self._f.close(); raise ValueError(f"{percorso}: file vuoto, non è un catalogo.")
+        try:
+            self._leggi_header()
+        except Exception:
+            self.close(); raise
+
+    def _leggi_header(self):
+        mm = self._mm
+        if len(mm) < _HEADER_CATALOGO.size:
+            raise ValueError(f"{self.percorso}: header del catalogo troncato.")
+        magic, versione, little, _, righe, impronta, len_schema = _HEADER_CATALOGO.unpack_from(mm, 0)
+        if magic != CATALOGO_MAGIC:
+            raise ValueError(f"{self.percorso}: non è un catalogo PK4C.")
+        if versione != CATALOGO_VERSIONE:
+            raise ValueError(f"{self.percorso}: versione catalogo {versione} non supportata.")
+        if bool(little) != (sys.byteorder == "little"):
+            raise ValueError(f"{self.percorso}: ordine dei byte diverso da quello della macchina.")
+        schema = json.loads(bytes(mm[_HEADER_CATALOGO.size:_HEADER_CATALOGO.size + len_schema]))
+        self.righe = righe
+        self.schema = tuple((nome, tipo) for nome, tipo, _, _ in schema["colonne"])
+        buf = memoryview(mm); self._viste = [buf]; self.colonne = {}
+        base = _inizio_dati(len_schema)
+        for nome, tipo, off, size in schema["colonne"]:
+            off += base
+            if array(tipo).itemsize != size:
+                raise ValueError(f"{self.percorso}: colonna '{nome}' con dimensione {size} non supportata qui.")
+            if off + size * righe > len(mm):
+                raise ValueError(f"{self.percorso}: colonna '{nome}' oltre la fine del file.")
+            mv = buf[off:off + size * righe].cast(tipo)
+            self._viste.append(mv); self.colonne[nome] = mv
+
+    @property
+    def impronta(self):
+        if self._impronta_memoria is not None: return self._impronta_memoria
+        raw = self._mm[_OFFSET_IMPRONTA:_OFFSET_IMPRONTA + 32]
+        return raw.rstrip(b"\0").decode("ascii")
+
+    def imposta_impronta(self, parametri):
+        self._mm[_OFFSET_IMPRONTA:_OFFSET_IMPRONTA + 32] = impronta_parametri(parametri).encode("ascii")
+
+    def aggiornato(self, parametri):
+        """True se i prezzi memorizzati sono stati calcolati con questi parametri."""
+        return self.prezzato and self.impronta == impronta_parametri(parametri)
+
+    @property
+    def prezzato(self):
+        return all(nome in self.colonne for nome in _NOMI_COLONNE)
+
+    def tabella(self):
+        if not self.prezzato: raise ValueError(f"{self.percorso}: catalogo non prezzato.")
+        return TabellaPreventivi(self.colonne)
+
+    def lavori(self):
+        c = self.colonne
+        return zip(c["lung_mm"], c["larg_mm"], c["quantita"], c["cmyk_level"], c["w_level"])
+
+    def riprezza(self, parametri_vecchi, parametri_nuovi):
+        """Riprezzo incrementale. In scrittura lavora sulle pagine del file; in sola lettura solo le
+        colonne toccate dai parametri cambiati vengono ricalcolate in memoria e il file resta intatto."""
+        tab = self.tabella()
+        impatto = riprezza_tabella(tab, parametri_vecchi, parametri_nuovi)
+        if not self.scrittura:
+            for nome, col in tab._colonne.items():
+                if not col.readonly: self.colonne[nome] = col  # colonne ricalcolate al posto delle viste sul file
+            self._impronta_memoria = impronta_parametri(parametri_nuovi)
+            return impatto
+        self.imposta_impronta(parametri_nuovi); self._mm.flush()
+        return impatto
+
+    def __len__(self): return self.righe
+
+    def close(self):
+        if getattr(self, "_mm", None) is None: return
+        for mv in reversed(getattr(self, "_viste", [])): mv.release()
+        self._viste = []; self.colonne = {}
+        try: self._mm.close()
+        except BufferError: pass  # restano viste esterne: la mappa si chiude quando vengono rilasciate
+        self._mm = None; self._f.close()
+
+    def __enter__(self): return self
+    def __exit__(self, *exc): self.close()
+
+def scrivi_catalogo(percorso, colonne, parametri=None, schema=None):
+    """Scrive un catalogo .pk4c (in modo atomico) da un dict nome -> buffer tipizzato."""
+    if schema is None:
+        schema = COLONNE_CATALOGO_PREZZATO if all(n in colonne for n in _NOMI_COLONNE) else COLONNE_LAVORO
+    righe = len(memoryview(colonne[schema[0][0]]))
+    tmp = percorso + ".tmp"
+    _crea_file_catalogo(tmp, schema, righe, impronta_parametri(parametri) if parametri is not None else "")
+    try:
+        with CatalogoMappato(tmp, scrittura=True) as cat:
+            for nome, _ in schema: cat.colonne[nome][:] = memoryview(colonne[nome])
+        os.replace(tmp, percorso)
+    except Exception:
+        try: os.remove(tmp)
+        except OSError: pass
+        raise
+
+def prezza_catalogo(parametri, percorso_lavori, percorso_out, avanzamento=None):
+    """Prezza un catalogo di lavori a blocchi, scrivendo direttamente nel file di output mappato.
+    avanzamento(frazione), se dato, viene chiamata dopo ogni blocco."""
+    tmp = percorso_out + ".tmp"
+    with CatalogoMappato(percorso_lavori) as src:
+        n = src.righe; c = src.colonne
+        _crea_file_catalogo(tmp, COLONNE_CATALOGO_PREZZATO, n, impronta_parametri(parametri))
+        try:
+            with CatalogoMappato(tmp, scrittura=True) as out:
+                o = out.colonne
+                for i in range(0, n, _RIGHE_PER_BLOCCO):
+                    j = min(n, i + _RIGHE_PER_BLOCCO)
+                    blocco = TabellaPreventivi.calcola(parametri, zip(c["lung_mm"][i:j], c["larg_mm"][i:j],
+                        c["quantita"][i:j], c["cmyk_level"][i:j], c["w_level"][i:j]))
+                    o["lung_mm"][i:j] = c["lung_mm"][i:j]; o["larg_mm"][i:j] = c["larg_mm"][i:j]
+                    for nome in _NOMI_COLONNE: o[nome][i:j] = blocco.colonna(nome)
+                    del blocco
+                    if avanzamento is not None: avanzamento(j / n)
+            os.replace(tmp, percorso_out)
+        except Exception:
+            try: os.remove(tmp)
+            except OSError: pass
+            raise
+    return n
+
+def csv_a_catalogo(percorso_csv, percorso_cat):
+    """Converte un CSV (separatore , ; o tab, decimali con punto o virgola) in catalogo .pk4c.
+    Le colonne di costo, se tutte presenti, vengono importate senza impronta: non si sa con quali
+    parametri siano state calcolate, quindi il catalogo risulta da riprezzare."""
+    with open(percorso_csv, "r", encoding="utf-8-sig", newline="") as f:
+        campione = f.read(4096); f.seek(0)
+        try: dialetto = csv.Sniffer().sniff(campione, delimiters=",;\t")
+        except csv.Error: dialetto = csv.excel
+        reader = csv.DictReader(f, dialect=dialetto)
+        intestazione = set(reader.fieldnames or ())
+        mancanti = [nome for nome, _ in COLONNE_LAVORO if nome not in intestazione]
+        if mancanti: raise ValueError(f"{percorso_csv}: colonne mancanti: {', '.join(mancanti)}.")
+        schema = COLONNE_CATALOGO_PREZZATO if intestazione.issuperset(_NOMI_COLONNE) else COLONNE_LAVORO
+        cols = {nome: array(tipo) for nome, tipo in schema}
+        lavoro = [(cols[nome].append, nome) for nome, _ in COLONNE_LAVORO]
+        costi = [(cols[nome].append, nome) for nome, _ in schema if nome not in _NOMI_LAVORO]
+        for riga, rec in enumerate(reader, start=2):
+            try:
+                valori = valida_lavoro(*(_to_float(rec[nome]) for _, nome in lavoro))
+                for (app, _), v in zip(lavoro, valori): app(v)
+                for app, nome in costi: app(_to_float(rec[nome]))
+            except (ValueError, TypeError, OverflowError) as e:
+                raise ValueError(f"{percorso_csv}: riga {riga} non valida: {e}") from None
+    scrivi_catalogo(percorso_cat, cols, None, schema)
+    return len(cols["lung_mm"])
+
+def catalogo_a_csv(percorso_cat, percorso_csv):
+    with CatalogoMappato(percorso_cat) as cat:
+        nomi = [nome for nome, _ in cat.schema]
+        derivati = ("costo_per_pezzo", "totale_commessa") if cat.prezzato else ()
+        with open(percorso_csv, "w", encoding="utf-8", newline="") as f:
+            w = csv.writer(f)
+            w.writerow(nomi + list(derivati))
+            tab = cat.tabella() if derivati else None
+            for i in range(0, cat.righe, _RIGHE_PER_BLOCCO):  # a blocchi: le colonne derivate non si materializzano intere
+                j = min(cat.righe, i + _RIGHE_PER_BLOCCO)
+                blocco = [cat.colonne[n][i:j] for n in nomi]
+                if derivati:
+                    fetta = tab[i:j]; blocco += [fetta.colonna(n) for n in derivati]
+                w.writerows(zip(*blocco))
+            blocco = fetta = tab = None  # rilascia le viste prima della chiusura del catalogo
+        return cat.righe
+
+def riepilogo_tabella(tabella):
+    """Totali di un lotto di preventivi per il report (ogni componente è pesato per la quantità)."""
+    c = tabella._colonne; q = c["quantita"]
+    tot = {nome: _somma_per_quantita(c[nome], q) for nome in _COMPONENTI_COSTO}
+    return {
+        "righe": len(tabella),
+        "pezzi": sum(q),
+        "mq_totali": _somma_per_quantita(c["area_mq"], q),
+        "consumo_cmyk_l": _somma_per_quantita(c["consumo_cmyk_l"], q),
+        "consumo_w_l": _somma_per_quantita(c["consumo_w_l"], q),
+        **tot,
+        "totale_commesse": sum(tot.values()),
+    }
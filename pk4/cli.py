@@ -0,0 +1,148 @@
+"""Riga di comando: senza argomenti avvia la GUI, altrimenti esegue il sottocomando."""
+import argparse
+import csv
+import json
+import sys
+
+from .core import APP_TITLE, carica_parametri, eur, format_it
+from .catalogo import CatalogoMappato, catalogo_a_csv, csv_a_catalogo, prezza_catalogo, riepilogo_tabella
+from .gang import MAX_LAVORI_RUN, MAX_MQ_RUN, raggruppa_gang_run
+from .produzione import (LavoroProduzione, ProfiloMacchina, benchmark_pianificatore, carica_scadenze,
+                         macchine_esempio, pianifica_produzione, ritardi_piano)
+
+# =============================== MAIN ===============================
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="pk4", description=APP_TITLE)
+    sub = ap.add_subparsers(dest="comando")
+    p = sub.add_parser("importa-csv", help="Converte un CSV di lavori/preventivi in catalogo .pk4c")
+    p.add_argument("csv"); p.add_argument("catalogo")
+    p = sub.add_parser("esporta-csv", help="Converte un catalogo .pk4c in CSV")
+    p.add_argument("catalogo"); p.add_argument("csv")
+    p = sub.add_parser("prezza", help="Prezza un catalogo di lavori con i parametri salvati")
+    p.add_argument("lavori"); p.add_argument("catalogo")
+    p = sub.add_parser("riepilogo", help="Totali di un catalogo prezzato")
+    p.add_argument("catalogo")
+    p = sub.add_parser("pianifica", help="Distribuisce i lavori di un catalogo (anche non prezzato) sulle stampanti")
+    p.add_argument("catalogo", nargs="?")
+    p.add_argument("--macchine", help="JSON con lista di {nome, velocita, bianco, avviamento_min}")
+    p.add_argument("--scadenze", help="CSV con colonne riga (indice del lavoro, da 0) e scadenza_h")
+    p.add_argument("--scadenza", type=float, help="Scadenza (ore dall'inizio turno) dei lavori senza scadenza nel CSV")
+    p.add_argument("--inizio", type=float, default=0.0, help="Ora di inizio del turno (default 0)")
+    p.add_argument("--benchmark", action="store_true", help="Confronta l'euristica con il solutore esatto")
+    p = sub.add_parser("gang", help="Raggruppa i lavori di un catalogo prezzato in gang run")
+    p.add_argument("catalogo")
+    p.add_argument("--max-mq", type=float, default=MAX_MQ_RUN, help=f"mq massimi per run (default {MAX_MQ_RUN:g}; 0 = nessun limite)")
+    p.add_argument("--max-lavori", type=int, default=MAX_LAVORI_RUN,
+                   help=f"lavori massimi per run (default {MAX_LAVORI_RUN}; 0 = nessun limite)")
+    p.add_argument("--scarto-mq", type=float, default=0.0, help="mq di scarto per avviamento")
+    p.add_argument("--csv", help="Scrive il risparmio per lavoro in questo CSV")
+    p = sub.add_parser("hotfolder", help="Demone: prezza i ticket JSON che compaiono in una cartella")
+    p.add_argument("cartella")
+    p.add_argument("--intervallo", type=float, default=0.5, help="secondi tra due controlli")
+    p.add_argument("--lotto", type=int, default=1000, help="ticket massimi per giro")
+    p.add_argument("--tentativi", type=int, default=5, help="letture fallite prima degli scarti")
+    p = sub.add_parser("carico", help="Test di carico: rampa di concorrenza con latenze p50/p95/p99")
+    p.add_argument("--url", help="Front end HTTP da provare (POST di un ticket JSON); default: calcolo in-process")
+    p.add_argument("--profilo", default="misto", help="Profilo sintetico: misto, piccoli, grandi")
+    p.add_argument("--catalogo", help="Campiona i lavori da questo catalogo .pk4c invece che dal profilo")
+    p.add_argument("--concorrenza", default="1,2,4,8", help="Livelli della rampa, separati da virgola")
+    p.add_argument("--richieste", type=int, default=2000, help="Richieste per livello")
+    p.add_argument("--durata", type=float, help="Secondi per livello (al posto di --richieste)")
+    p.add_argument("--processi", action="store_true", help="Lavoratori in processi separati invece che thread")
+    p.add_argument("--default", action="store_true", help="Prezza con DEFAULT_PARAMETRI invece dei parametri salvati")
+    p.add_argument("--salva", default="risultati_carico", help="Cartella dove salvare il JSON dell'esecuzione")
+    p.add_argument("--confronta", help="JSON di un'esecuzione precedente da confrontare")
+    args = ap.parse_args(argv)
+
+    if args.comando is None:
+        from .gui import App  # tkinter solo per la GUI
+        app = App()
+        app.mainloop()
+        return 0
+    if args.comando == "hotfolder":
+        import logging
+        from .hotfolder import CartellaCalda
+        logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+        CartellaCalda(args.cartella, lotto=args.lotto, tentativi=args.tentativi).esegui(args.intervallo)
+        return 0
+    parametri = carica_parametri()
+    if args.comando == "carico":
+        from .carico import (confronta_rampe, esegui_rampa, formatta_rampa, lavori_da_catalogo,
+                             lavori_sintetici, salva_risultati)
+        from .core import DEFAULT_PARAMETRI
+        livelli = [int(x) for x in args.concorrenza.split(",") if x.strip()]
+        if args.catalogo:
+            lavori = lavori_da_catalogo(args.catalogo, 10000); origine = f"catalogo {args.catalogo}"
+        else:
+            lavori = lavori_sintetici(args.profilo, 10000); origine = f"profilo {args.profilo}"
+        bersaglio = ("http", args.url, 10.0) if args.url else \
+            ("inprocess", dict(DEFAULT_PARAMETRI) if args.default else parametri)
+        esito = esegui_rampa(bersaglio, lavori, livelli, args.richieste, args.durata, args.processi, origine)
+        print(formatta_rampa(esito))
+        print(f"Salvato in {salva_risultati(esito, args.salva)}")
+        if args.confronta:
+            with open(args.confronta, "r", encoding="utf-8") as f: prima = json.load(f)
+            print(confronta_rampe(prima, esito))
+        return 0
+    if args.comando == "importa-csv":
+        n = csv_a_catalogo(args.csv, args.catalogo)
+        print(f"{format_it(n, 0)} righe scritte in {args.catalogo}")
+    elif args.comando == "esporta-csv":
+        n = catalogo_a_csv(args.catalogo, args.csv)
+        print(f"{format_it(n, 0)} righe scritte in {args.csv}")
+    elif args.comando == "prezza":
+        n = prezza_catalogo(parametri, args.lavori, args.catalogo)
+        print(f"{format_it(n, 0)} lavori prezzati in {args.catalogo}")
+    elif args.comando == "riepilogo":
+        with CatalogoMappato(args.catalogo) as cat:
+            if not cat.aggiornato(parametri):
+                print("Attenzione: prezzi calcolati con parametri diversi da quelli salvati.", file=sys.stderr)
+            for k, v in riepilogo_tabella(cat.tabella()).items(): print(f"{k}: {format_it(v, 0 if isinstance(v, int) else 2)}")
+    elif args.comando == "pianifica":
+        if args.benchmark:
+            for k, v in benchmark_pianificatore().items(): print(f"{k}: {format_it(v, 0 if isinstance(v, int) else 3)}")
+            return 0
+        if not args.catalogo: ap.error("pianifica: indicare un catalogo oppure --benchmark")
+        if args.macchine:
+            with open(args.macchine, "r", encoding="utf-8") as f: macchine = [ProfiloMacchina.da_dict(d) for d in json.load(f)]
+        else:
+            macchine = macchine_esempio()
+        scadenze = carica_scadenze(args.scadenze) if args.scadenze else {}
+        with CatalogoMappato(args.catalogo) as cat:  # bastano misure, quantità e livelli
+            lavori = [LavoroProduzione.da_misure(i, *lav, scadenze.get(i, args.scadenza))
+                      for i, lav in enumerate(cat.lavori())]
+        fuori = [r for r in scadenze if r >= len(lavori)]
+        if fuori: print(f"Attenzione: {len(fuori)} scadenze per righe inesistenti ignorate.", file=sys.stderr)
+        piano = pianifica_produzione(lavori, macchine, inizio_h=args.inizio)
+        for nome, righe in piano["macchine"].items():
+            print(f"{nome}: {len(righe)} lavori, {format_it(piano['carico_h'][nome], 2)} h")
+        print(f"Makespan: {format_it(piano['makespan_h'], 2)} h")
+        if any(lav.scadenza_h is not None for lav in lavori):
+            in_ritardo, ritardo_max = ritardi_piano(piano["macchine"])
+            print(f"Lavori in ritardo: {format_it(in_ritardo, 0)}")
+            if in_ritardo:
+                righe = sorted(piano["in_ritardo"])
+                print(f"Ritardo massimo: {format_it(ritardo_max, 2)} h; righe: "
+                      f"{', '.join(map(str, righe[:20]))}{' …' if len(righe) > 20 else ''}")
+        if piano["non_assegnabili"]:
+            print(f"Lavori senza stampante con bianco: {len(piano['non_assegnabili'])}", file=sys.stderr)
+    elif args.comando == "gang":
+        if not args.max_mq and not args.max_lavori: ap.error("gang: serve almeno un limite tra --max-mq e --max-lavori")
+        with CatalogoMappato(args.catalogo) as cat:
+            if not cat.aggiornato(parametri):
+                # i costi memorizzati non sono confrontabili con la prestampa attuale: si ricalcolano in memoria
+                print("Attenzione: prezzi calcolati con parametri diversi da quelli salvati; "
+                      "ricalcolati in memoria per il raggruppamento.", file=sys.stderr)
+                cat.riprezza({}, parametri)
+            esito = raggruppa_gang_run(parametri, enumerate(cat.tabella()), args.max_mq or None, args.max_lavori or None,
+                                       args.scarto_mq)
+        print(f"{format_it(len(esito['lavori']), 0)} lavori in {format_it(len(esito['run']), 0)} gang run")
+        print(f"Risparmio totale: {eur(esito['risparmio_totale'])}")
+        if args.csv:
+            with open(args.csv, "w", encoding="utf-8", newline="") as f:
+                w = csv.writer(f)
+                w.writerow(["riga", "run", "costo_singolo", "costo_gang", "risparmio"])
+                for id_, r in esito["lavori"].items():
+                    w.writerow([id_, r["run"], r["costo_singolo"], r["costo_gang"], r["risparmio"]])
+    return 0
@@ -0,0 +1,123 @@
+"""Nucleo di calcolo PrintK: parametri, formattatori e breakdown dei costi (senza tkinter)."""
+import os
+
+# =============================== CONFIG & DEFAULTS ===============================
+
+DIRECTORY_HOME = os.path.expanduser("~")
+PERCORSO_FILE_CONFIG = os.path.join(DIRECTORY_HOME, "configurazione.json")
+
+DEFAULT_PARAMETRI = {
+    "volume_annuo_mq": 16000,
+    "costo_C_litro": 175.0,
+    "costo_M_litro": 175.0,
+    "costo_Y_litro": 175.0,
+    "costo_K_litro": 175.0,
+    "costo_W_litro": 210.0,
+    "consumo_CMYK_mq": 0.006,   # L/mq per 1x CMYK
+    "consumo_W_mq": 0.015,      # L/mq per 1W
+    "costi_vari_operatore_mq": 0.96,
+    "investimento_mq": 1.66,
+    "assistenza_ricambi_mq": 0.96,
+    "costo_orario_prestampa": 25.0
+}
+
+APP_TITLE = "PrintK v 4.0"
+
+# =============================== FORMATTATORI IT ===============================
+
+def format_it(x, dec=2):
+    """Formatta con separatore migliaia '.' e decimale ','"""
+    try:
+        n = float(x)
+    except Exception:
+        return str(x)
+    s = f"{n:,.{dec}f}"             # 12,345.67
+    s = s.replace(",", "X").replace(".", ",").replace("X", ".")
+    return s
+
+def eur(x, dec=2):
+    return f"€ {format_it(x, dec)}"
+
+# =============================== UTILS ===============================
+
+def _to_float(s: str) -> float:
+    s = (s or "").strip().replace(",", ".")
+    return float(s)
+
+_INF = float("inf")
+
+def valida_lavoro(lung_mm, larg_mm, quantita, cmyk_level=0, w_level=0):
+    """Controlla i dati di un lavoro (da GUI, CSV, ticket o tabella) e li restituisce con quantità e livelli int.
+    Dimensioni finite > 0, quantità intera >= 1, livelli interi >= 0; altrimenti ValueError."""
+    if (0 < lung_mm < _INF and 0 < larg_mm < _INF and 1 <= quantita < _INF
+            and 0 <= cmyk_level < _INF and 0 <= w_level < _INF):  # NaN fallisce ogni confronto
+        q = int(quantita); c = int(cmyk_level); w = int(w_level)
+        if q == quantita and c == cmyk_level and w == w_level: return lung_mm, larg_mm, q, c, w
+    if not 0 < lung_mm < _INF: raise ValueError("La lunghezza deve essere un numero maggiore di 0.")
+    if not 0 < larg_mm < _INF: raise ValueError("La larghezza deve essere un numero maggiore di 0.")
+    if not (1 <= quantita < _INF and quantita == int(quantita)):
+        raise ValueError("La quantità deve essere un numero intero di pezzi, almeno 1.")
+    raise ValueError("I livelli CMYK e bianco devono essere interi >= 0.")
+
+def carica_parametri():
+    import json  # importato qui: json (con re) è da solo la parte più lenta dell'import del nucleo
+    try:
+        with open(PERCORSO_FILE_CONFIG, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        data = {}
+    if "Volume,estimato per anno mq" in data:
+        data["volume_annuo_mq"] = data.pop("Volume,estimato per anno mq")
+    for k, v in DEFAULT_PARAMETRI.items():
+        data.setdefault(k, v)
+    for k in list(data.keys()):
+        try:
+            data[k] = float(data[k])
+        except (ValueError, TypeError):
+            if isinstance(DEFAULT_PARAMETRI.get(k), (int, float)):
+                data[k] = float(DEFAULT_PARAMETRI[k])
+    return data
+
+def salva_parametri(parametri: dict):
+    import json
+    with open(PERCORSO_FILE_CONFIG, "w", encoding="utf-8") as f:
+        json.dump(parametri, f, indent=4, ensure_ascii=False)
+
+def _componenti_costo(parametri, lung_mm, larg_mm, quantita, cmyk_level, w_level):
+    """Componenti di costo per pezzo: (area, consumo CMYK, consumo W, costo CMYK, costo W, costi vari, prestampa)."""
+    if lung_mm <= 0 or larg_mm <= 0 or quantita <= 0:
+        raise ValueError("Valori di lunghezza, larghezza e quantità devono essere > 0.")
+    area_mq = (lung_mm / 1000.0) * (larg_mm / 1000.0)
+    consumo_cmyk = (parametri["consumo_CMYK_mq"] * area_mq * cmyk_level) if cmyk_level > 0 else 0.0
+    consumo_w    = (parametri["consumo_W_mq"]   * area_mq * w_level)    if w_level   > 0 else 0.0
+    moltiplicatore_costi = float(w_level + 1)
+    base_vari_mq = (parametri["costi_vari_operatore_mq"] + parametri["investimento_mq"] + parametri["assistenza_ricambi_mq"])
+    costi_vari = base_vari_mq * area_mq * moltiplicatore_costi
+    costo_cmyk = parametri["costo_C_litro"] * consumo_cmyk
+    costo_w    = parametri["costo_W_litro"] * consumo_w
+    costo_prestampa_unit = parametri["costo_orario_prestampa"] / quantita
+    return area_mq, consumo_cmyk, consumo_w, costo_cmyk, costo_w, costi_vari, costo_prestampa_unit
+
+def breakdown_costo(parametri, lung_mm, larg_mm, quantita, cmyk_level, w_level):
+    area_mq, consumo_cmyk, consumo_w, costo_cmyk, costo_w, costi_vari, costo_prestampa_unit = \
+        _componenti_costo(parametri, lung_mm, larg_mm, quantita, cmyk_level, w_level)
+    moltiplicatore_costi = float(w_level + 1)
+    costo_per_pezzo = costo_cmyk + costo_w + costi_vari + costo_prestampa_unit
+    totale_commessa = costo_per_pezzo * quantita
+    costo_al_mq = (costo_per_pezzo / area_mq) if area_mq > 0 else 0.0
+    return {
+        "area_mq": area_mq,
+        "consumo_cmyk_l": consumo_cmyk,
+        "consumo_w_l": consumo_w,
+        "costo_cmyk": costo_cmyk,
+        "costo_w": costo_w,
+        "costi_vari": costi_vari,
+        "costo_prestampa_unit": costo_prestampa_unit,
+        "costo_per_pezzo": costo_per_pezzo,
+        "totale_commessa": totale_commessa,
+        "costo_al_mq": costo_al_mq,
+        "quantita": int(quantita),
+        "w_level": int(w_level),
+        "cmyk_level": int(cmyk_level),
+        "moltiplicatore_costi": moltiplicatore_costi
+    }
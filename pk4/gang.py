@@ -0,0 +1,76 @@
+"""Raggruppamento in gang run per condividere prestampa e scarto di avviamento."""
+from bisect import bisect_left
+
+_INF = float("inf")
+
+# Capacità di default di una gang run: quanto si imposta e si stampa in una sola sessione di prestampa
+# (circa un rotolo di supporto, un file di nesting gestibile). Senza limiti tutti i lavori dello stesso
+# setup finirebbero in un'unica run e il risparmio sulla prestampa sarebbe irrealistico.
+MAX_MQ_RUN = 50.0
+MAX_LAVORI_RUN = 20
+
+# =============================== GANG RUN ===============================
+
+def costo_mq_setup(parametri, cmyk_level, w_level):
+    """Costo di un mq stampato con un dato setup (inchiostri + costi vari), senza prestampa."""
+    base_vari_mq = (parametri["costi_vari_operatore_mq"] + parametri["investimento_mq"] + parametri["assistenza_ricambi_mq"])
+    return (parametri["costo_C_litro"] * parametri["consumo_CMYK_mq"] * cmyk_level
+            + parametri["costo_W_litro"] * parametri["consumo_W_mq"] * w_level
+            + base_vari_mq * float(w_level + 1))
+
+def _riempi_run(voci, max_mq_run, max_lavori_run):
+    """Best-fit decreasing: voci (mq, indice) -> liste di indici. La run con il residuo più piccolo
+    sufficiente si trova per bisezione, ma pop/insert sulla lista dei residui costano O(r) (r = run
+    aperte): O(n log n + n·r) nel caso peggiore, con spostamenti in blocco molto rapidi in pratica."""
+    run = []; liberi = []  # (residuo, n. run) ordinati per residuo
+    for mq, idx in sorted(voci, reverse=True):
+        if max_mq_run is None:
+            pos = 0 if liberi else None
+        else:
+            pos = bisect_left(liberi, (mq, -1))
+            if pos == len(liberi): pos = None
+        if pos is None:
+            run.append([idx]); r = len(run) - 1
+            residuo = _INF if max_mq_run is None else max_mq_run - mq
+        else:
+            residuo, r = liberi.pop(pos); run[r].append(idx); residuo -= mq
+        if (max_lavori_run is None or len(run[r]) < max_lavori_run) and residuo > 0:
+            liberi.insert(bisect_left(liberi, (residuo, r)), (residuo, r))
+    return run
+
+def raggruppa_gang_run(parametri, preventivi, max_mq_run=MAX_MQ_RUN, max_lavori_run=MAX_LAVORI_RUN,
+                       scarto_mq_avvio=0.0):
+    """Raggruppa lavori con lo stesso setup CMYK/W in gang run che condividono una sola prestampa
+    (e lo scarto di avviamento), ripartite in proporzione ai mq stampati.
+
+    preventivi: iterabile di (id, details) con details da breakdown_costo, Preventivo o riga di
+    TabellaPreventivi; gli id devono essere univoci. max_mq_run / max_lavori_run limitano la capacità
+    di ogni run (default MAX_MQ_RUN / MAX_LAVORI_RUN); None toglie quel limite, ma almeno uno serve.
+    """
+    if max_mq_run is None and max_lavori_run is None:
+        raise ValueError("Serve almeno un limite di capacità per run (mq o numero di lavori).")
+    prestampa = float(parametri["costo_orario_prestampa"])
+    classi = {}; voci = []; visti = set()
+    for id_, d in preventivi:
+        if id_ in visti: raise ValueError(f"Id lavoro duplicato: {id_!r}.")
+        visti.add(id_)
+        mq = d["area_mq"] * d["quantita"]
+        i = len(voci); voci.append((id_, d, mq))
+        classi.setdefault((int(d["cmyk_level"]), int(d["w_level"])), []).append((mq, i))
+
+    elenco_run = []; lavori = {}; risparmio_totale = 0.0
+    for setup, membri in sorted(classi.items()):
+        scarto = scarto_mq_avvio * costo_mq_setup(parametri, *setup)
+        for indici in _riempi_run(membri, max_mq_run, max_lavori_run):
+            mq_run = sum(voci[i][2] for i in indici); r = len(elenco_run)
+            elenco_run.append({"setup": setup, "lavori": [voci[i][0] for i in indici], "mq": mq_run,
+                               "prestampa": prestampa, "scarto": scarto})
+            for i in indici:
+                id_, d, mq = voci[i]; quota = mq / mq_run
+                singolo = d["totale_commessa"] + scarto
+                gang = d["totale_commessa"] - d["costo_prestampa_unit"] * d["quantita"] + (prestampa + scarto) * quota
+                lavori[id_] = {"run": r, "costo_singolo": singolo, "costo_gang": gang,
+                               "quota_prestampa": prestampa * quota, "quota_scarto": scarto * quota,
+                               "risparmio": singolo - gang}
+                risparmio_totale += singolo - gang
+    return {"run": elenco_run, "lavori": lavori, "risparmio_totale": risparmio_totale}
@@ -0,0 +1,204 @@
+"""Cartella calda: prezza i ticket JSON lasciati dal RIP e scrive i risultati accanto ai ticket."""
+import json
+import logging
+import os
+import time
+
+from .core import PERCORSO_FILE_CONFIG, carica_parametri
+from .catalogo import impronta_parametri
+from .risultati import preventivo
+
+log = logging.getLogger(__name__)
+
+SUFFISSO_TICKET = ".json"
+SUFFISSO_RISULTATO = ".risultato.json"
+SUFFISSO_ERRORE = ".errore.json"
+CARTELLA_SCARTI = "scarti"
+
+class TicketNonValido(ValueError):
+    """Ticket leggibile ma con dati non prezzabili: va direttamente negli scarti."""
+
+def _nome_risultato(nome_ticket):
+    return nome_ticket[:-len(SUFFISSO_TICKET)] + SUFFISSO_RISULTATO
+
+def _e_ticket(nome):
+    return (nome.endswith(SUFFISSO_TICKET) and not nome.startswith(".")
+            and not nome.endswith(SUFFISSO_RISULTATO) and not nome.endswith(SUFFISSO_ERRORE))
+
+def scrivi_json_atomico(percorso, dati):
+    """Scrive su un file temporaneo nella stessa cartella e lo rinomina: chi legge vede il file intero o niente."""
+    tmp = percorso + ".tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(dati, f, ensure_ascii=False)
+        os.replace(tmp, percorso)
+    except OSError:
+        try: os.remove(tmp)
+        except OSError: pass
+        raise
+
+def _numero(ticket, campo, default=None):
+    """Valore numerico di un campo del ticket (i booleani JSON non valgono come numeri)."""
+    valore = ticket[campo] if default is None else ticket.get(campo, default)
+    if isinstance(valore, bool): raise TicketNonValido(f"Campo '{campo}' non numerico.")
+    try: return float(valore)
+    except (TypeError, ValueError): raise TicketNonValido(f"Campo '{campo}' non numerico.") from None
+
+def prezza_ticket(parametri, ticket):
+    """Da un ticket {lung_mm, larg_mm, quantita, cmyk_level, w_level[, id]} al dict del risultato."""
+    if not isinstance(ticket, dict): raise TicketNonValido("Il ticket deve essere un oggetto JSON.")
+    try:
+        lavoro = (_numero(ticket, "lung_mm"), _numero(ticket, "larg_mm"), _numero(ticket, "quantita"),
+                  _numero(ticket, "cmyk_level", 0), _numero(ticket, "w_level", 0))
+    except KeyError as e:
+        raise TicketNonValido(f"Campo mancante: {e.args[0]}.") from None
+    try:
+        details = preventivo(parametri, *lavoro)  # valida dimensioni, quantità e livelli
+    except ValueError as e:
+        raise TicketNonValido(str(e)) from None
+    risultato = details.as_dict()
+    if "id" in ticket: risultato["id"] = ticket["id"]
+    return risultato
+
+class CartellaCalda:
+    """Sorveglia una cartella di ticket e la tiene allineata con i file di risultato.
+
+    La cartella viene riletta solo se cambia il suo mtime, se ci sono ticket in attesa
+    (troppo recenti o da riprovare) o ogni `scansione_completa_s` secondi. Un ticket illeggibile
+    (per esempio ancora in scrittura) viene riprovato con attesa crescente; dopo `tentativi`
+    errori, o subito se i dati non sono prezzabili, finisce in `scarti/` con un file .errore.json.
+    Se non si riesce a scrivere un risultato (disco pieno, permessi) l'errore viene registrato nel log
+    e il ticket riprovato più tardi, con attesa crescente fino a `attesa_max_s`: il demone non si ferma.
+    """
+
+    def __init__(self, cartella, lotto=1000, tentativi=5, attesa_base_s=0.5, stabilita_s=0.2,
+                 scansione_completa_s=30.0, attesa_max_s=60.0):
+        self.cartella = cartella; self.scarti = os.path.join(cartella, CARTELLA_SCARTI)
+        self.lotto = lotto; self.tentativi = tentativi; self.attesa_base_s = attesa_base_s; self.attesa_max_s = attesa_max_s
+        self.stabilita_s = stabilita_s; self.scansione_completa_s = scansione_completa_s
+        self._fatti = set()       # ticket con risultato già scritto
+        self._in_attesa = {}      # nome -> (letture fallite, scritture fallite, istante del prossimo tentativo)
+        self._mtime_cartella = None; self._ultima_scansione = 0.0; self._arretrato = False
+        self._mtime_parametri = None; self.parametri = None; self._impronta = ""
+        os.makedirs(self.scarti, exist_ok=True)
+        self._ricarica_parametri()
+
+    def _ricarica_parametri(self):
+        try: mtime = os.stat(PERCORSO_FILE_CONFIG).st_mtime_ns
+        except OSError: mtime = None
+        if self.parametri is not None and mtime == self._mtime_parametri: return
+        self._mtime_parametri = mtime; self.parametri = carica_parametri()
+        self._impronta = impronta_parametri(self.parametri)
+        log.info("Parametri caricati (impronta %s)", self._impronta)
+
+    def _da_scansionare(self, ora):
+        try: mtime = os.stat(self.cartella).st_mtime_ns
+        except OSError: return False
+        if (self._arretrato or mtime != self._mtime_cartella
+                or ora - self._ultima_scansione >= self.scansione_completa_s):
+            self._mtime_cartella = mtime; return True
+        return any(t <= ora for _, _, t in self._in_attesa.values())
+
+    def _scansiona(self, ora):
+        """Ticket pronti da elaborare, al massimo `lotto`."""
+        self._ultima_scansione = ora
+        nomi = []; risultati = set()
+        with os.scandir(self.cartella) as it:
+            for e in it:
+                if e.name.endswith(SUFFISSO_RISULTATO): risultati.add(e.name)
+                elif _e_ticket(e.name): nomi.append(e)
+        pronti = []; adesso = time.time(); self._arretrato = False
+        for e in nomi:
+            nome = e.name
+            if nome in self._fatti: continue
+            if _nome_risultato(nome) in risultati: self._fatti.add(nome); continue
+            letture, scritture, quando = self._in_attesa.get(nome, (0, 0, 0.0))
+            if quando > ora: continue
+            try:
+                if adesso - e.stat().st_mtime < self.stabilita_s:
+                    self._in_attesa[nome] = (letture, scritture, ora + self.stabilita_s); continue
+            except OSError:
+                continue
+            pronti.append(nome)
+            if len(pronti) >= self.lotto: self._arretrato = True; break
+        # dimentica i ticket spariti (rimossi dal RIP insieme al risultato)
+        presenti = {e.name for e in nomi}
+        self._fatti &= presenti
+        for nome in [n for n in self._in_attesa if n not in presenti]: del self._in_attesa[nome]
+        return pronti
+
+    def _rinvia(self, nome, ora, scrittura=False):
+        """Pianifica un nuovo tentativo con attesa crescente. Letture e scritture fallite si contano a parte:
+        solo le letture portano agli scarti, e una scrittura fallita azzera le letture (il ticket era leggibile).
+        Restituisce il numero di errori del tipo indicato."""
+        letture, scritture, _ = self._in_attesa.get(nome, (0, 0, 0.0))
+        if scrittura: letture = 0; scritture += 1; errori = scritture
+        else: letture += 1; errori = letture
+        attesa = min(self.attesa_max_s, self.attesa_base_s * 2 ** min(errori - 1, 30))
+        self._in_attesa[nome] = (letture, scritture, ora + attesa)
+        return errori
+
+    def _scarta(self, nome, motivo, ora):
+        spostato = True
+        try:
+            os.replace(os.path.join(self.cartella, nome), os.path.join(self.scarti, nome))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            spostato = False; log.error("Impossibile spostare %s negli scarti: %s", nome, e)
+        try:
+            scrivi_json_atomico(os.path.join(self.scarti, nome[:-len(SUFFISSO_TICKET)] + SUFFISSO_ERRORE),
+                                {"ticket": nome, "errore": motivo})
+        except OSError as e:
+            log.error("Impossibile scrivere l'errore del ticket %s: %s", nome, e)
+            if not spostato: self._rinvia(nome, ora); return "riprovati"
+        if not spostato: self._fatti.add(nome)  # resta in cartella, ma non si riprova a ogni giro
+        self._in_attesa.pop(nome, None)
+        log.warning("Ticket %s scartato: %s", nome, motivo)
+        return "scartati"
+
+    def _elabora(self, nome, ora):
+        percorso = os.path.join(self.cartella, nome)
+        try:
+            with open(percorso, "r", encoding="utf-8") as f: ticket = json.load(f)
+            risultato = prezza_ticket(self.parametri, ticket)
+        except TicketNonValido as e:
+            return self._scarta(nome, str(e), ora)
+        except (OSError, ValueError) as e:  # file sparito, incompleto o JSON troncato: si riprova
+            errori = self._rinvia(nome, ora)
+            if errori >= self.tentativi:
+                return self._scarta(nome, f"Illeggibile dopo {errori} tentativi: {e}", ora)
+            return "riprovati"
+        risultato["ticket"] = nome; risultato["impronta_parametri"] = self._impronta
+        try:
+            scrivi_json_atomico(os.path.join(self.cartella, _nome_risultato(nome)), risultato)
+        except OSError as e:  # non è colpa del ticket: niente scarti, si riprova più tardi
+            log.error("Impossibile scrivere il risultato di %s: %s", nome, e)
+            self._rinvia(nome, ora, scrittura=True); return "riprovati"
+        self._fatti.add(nome); self._in_attesa.pop(nome, None)
+        return "prezzati"
+
+    def elabora_una_volta(self):
+        """Un giro di sorveglianza; restituisce i conteggi del lotto elaborato."""
+        ora = time.monotonic()
+        esito = {"prezzati": 0, "riprovati": 0, "scartati": 0}
+        if not self._da_scansionare(ora): return esito
+        self._ricarica_parametri()
+        for nome in self._scansiona(ora):
+            esito[self._elabora(nome, ora)] += 1
+        if any(esito.values()):
+            log.info("Lotto: %(prezzati)d prezzati, %(riprovati)d da riprovare, %(scartati)d scartati", esito)
+        return esito
+
+    def esegui(self, intervallo_s=0.5):
+        """Ciclo del demone; esce con Ctrl+C."""
+        log.info("Sorveglio %s", self.cartella)
+        try:
+            while True:
+                try:
+                    self.elabora_una_volta()
+                except OSError as e:  # cartella temporaneamente irraggiungibile: si riprova al prossimo giro
+                    log.error("Errore durante la sorveglianza di %s: %s", self.cartella, e); self._arretrato = False
+                if not self._arretrato: time.sleep(intervallo_s)  # lotto pieno: si prosegue subito
+        except KeyboardInterrupt:
+            log.info("Arresto richiesto.")
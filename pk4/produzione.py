@@ -0,0 +1,345 @@
+"""Pianificazione della produzione su più stampanti a partire dalle passate."""
+import csv
+import random
+import time
+from bisect import bisect_right
+from itertools import product
+
+from .core import _to_float
+
+# =============================== PIANIFICAZIONE PRODUZIONE ===============================
+
+def passaggi_lavoro(cmyk_level, w_level):
+    """Passate macchina: ogni livello CMYK e ogni strato W è una passata (minimo 1)."""
+    return max(1, int(cmyk_level) + int(w_level))
+
+class ProfiloMacchina:
+    """Stampante: velocità (mq/h a 1 passata, o dict {passate: mq/h}), bianco sì/no, avviamento per lavoro."""
+    __slots__ = ("nome", "velocita", "bianco", "avviamento_h")
+
+    def __init__(self, nome, velocita, bianco=True, avviamento_min=0.0):
+        if isinstance(velocita, dict):
+            velocita = {int(k): float(v) for k, v in velocita.items()}
+            if not velocita or min(velocita.values()) <= 0: raise ValueError(f"{nome}: velocità non valida.")
+        elif float(velocita) <= 0: raise ValueError(f"{nome}: velocità non valida.")
+        else: velocita = float(velocita)
+        self.nome = nome; self.velocita = velocita; self.bianco = bool(bianco)
+        self.avviamento_h = float(avviamento_min) / 60.0
+
+    @classmethod
+    def da_dict(cls, d):
+        return cls(d["nome"], d["velocita"], d.get("bianco", True), d.get("avviamento_min", 0.0))
+
+    def mq_ora(self, passaggi):
+        v = self.velocita
+        if not isinstance(v, dict): return v / passaggi
+        if passaggi in v: return v[passaggi]
+        # passate non profilate: scala dalla più vicina inferiore (o dalla minima disponibile)
+        k = max((p for p in v if p <= passaggi), default=min(v))
+        return v[k] * k / passaggi
+
+    def puo_stampare(self, lavoro): return self.bianco or not lavoro.w_level
+
+    def tempo_h(self, lavoro):
+        return self.avviamento_h + lavoro.area_mq * lavoro.quantita / self.mq_ora(lavoro.passaggi)
+
+class LavoroProduzione:
+    """Lavoro in coda: superficie per pezzo, quantità, livelli e scadenza (ore dall'inizio turno, o None)."""
+    __slots__ = ("id", "area_mq", "quantita", "cmyk_level", "w_level", "scadenza_h")
+
+    def __init__(self, id, area_mq, quantita, cmyk_level, w_level, scadenza_h=None):
+        self.id = id; self.area_mq = float(area_mq); self.quantita = int(quantita)
+        self.cmyk_level = int(cmyk_level); self.w_level = int(w_level)
+        self.scadenza_h = None if scadenza_h is None else float(scadenza_h)
+
+    @classmethod
+    def da_preventivo(cls, id, details, scadenza_h=None):
+        """Da un dict di breakdown_costo, un Preventivo o una riga di TabellaPreventivi."""
+        return cls(id, details["area_mq"], details["quantita"], details["cmyk_level"], details["w_level"], scadenza_h)
+
+    @classmethod
+    def da_misure(cls, id, lung_mm, larg_mm, quantita, cmyk_level, w_level, scadenza_h=None):
+        """Dalle misure di un catalogo di lavori (anche non prezzato)."""
+        return cls(id, (lung_mm / 1000.0) * (larg_mm / 1000.0), quantita, cmyk_level, w_level, scadenza_h)
+
+    @property
+    def passaggi(self): return passaggi_lavoro(self.cmyk_level, self.w_level)
+
+    def __repr__(self): return f"LavoroProduzione({self.id!r})"
+
+_INF = float("inf")
+
+def _scadenza(lavoro): return _INF if lavoro.scadenza_h is None else lavoro.scadenza_h
+
+def _ritardo_massimo(coda, durate, inizio_h):
+    """Ritardo massimo di una coda già in ordine di scadenza (EDD, ottimo sulla singola macchina)."""
+    t = inizio_h; peggiore = -_INF
+    for lav in coda:
+        t += durate[lav]
+        peggiore = max(peggiore, t - _scadenza(lav))
+    return peggiore
+
+class _CodaMacchina:
+    """Coda EDD di una macchina con fine lavori e massimi di ritardo prefisso/suffisso,
+    così l'effetto di un inserimento si valuta in O(log n)."""
+    __slots__ = ("lavori", "chiavi", "fine", "pref", "suff", "carico", "durate", "inizio_h")
+
+    def __init__(self, lavori, chiave, durate, inizio_h):
+        self.durate = durate; self.inizio_h = inizio_h
+        self.lavori = sorted(lavori, key=chiave); self.chiavi = [chiave(l) for l in self.lavori]
+        self._aggiorna()
+
+    def _aggiorna(self):
+        t = self.inizio_h; fine = []; pref = [-_INF]
+        for lav in self.lavori:
+            t += self.durate[lav]; fine.append(t); pref.append(max(pref[-1], t - _scadenza(lav)))
+        suff = [-_INF] * (len(fine) + 1)
+        for i in range(len(fine) - 1, -1, -1):
+            suff[i] = max(suff[i + 1], fine[i] - _scadenza(self.lavori[i]))
+        self.fine = fine; self.pref = pref; self.suff = suff; self.carico = t - self.inizio_h
+
+    @property
+    def ritardo(self): return self.pref[-1]
+
+    def ritardo_con(self, lav, k):
+        """Ritardo massimo se si inserisse lav (chiave k) rispettando l'ordine EDD."""
+        p = bisect_right(self.chiavi, k); d = self.durate[lav]
+        inizio = self.fine[p - 1] if p else self.inizio_h
+        return max(self.pref[p], inizio + d - _scadenza(lav), self.suff[p] + d)
+
+    def inserisci(self, lav, k):
+        p = bisect_right(self.chiavi, k); self.lavori.insert(p, lav); self.chiavi.insert(p, k); self._aggiorna()
+
+    def rimuovi(self, lav):
+        p = self.lavori.index(lav); del self.lavori[p]; del self.chiavi[p]; self._aggiorna()
+
+def pianifica_produzione(lavori, macchine, inizio_h=0.0, candidati=12, max_iterazioni=None):
+    """Assegna i lavori alle stampanti minimizzando il makespan.
+
+    Euristica: list scheduling per scadenza e poi durata decrescente (LPT) sulla macchina
+    compatibile che finisce prima, seguita da una ricerca locale che sposta o scambia i lavori
+    più lunghi della macchina critica senza peggiorare i ritardi. Ogni coda è in ordine di scadenza.
+    """
+    macchine = list(macchine)
+    durate = {m.nome: {} for m in macchine}; assegnati = {m.nome: [] for m in macchine}
+    carico = {m.nome: 0.0 for m in macchine}; compatibili = {}; non_assegnabili = []
+    for lav in lavori:
+        ok = [m.nome for m in macchine if m.puo_stampare(lav)]
+        if not ok: non_assegnabili.append(lav.id); continue
+        compatibili[lav] = ok
+        for m in macchine:
+            if m.nome in ok: durate[m.nome][lav] = m.tempo_h(lav)
+    rif = {lav: min(durate[n][lav] for n in ok) for lav, ok in compatibili.items()}
+    chiave = lambda l: (_scadenza(l), -rif[l])
+    for lav in sorted(compatibili, key=chiave):
+        nome = min(compatibili[lav], key=lambda n: carico[n] + durate[n][lav])
+        carico[nome] += durate[nome][lav]; assegnati[nome].append(lav)
+    code = {m.nome: _CodaMacchina(assegnati[m.nome], chiave, durate[m.nome], inizio_h) for m in macchine}
+
+    # Ricerca locale sulla macchina critica: prima spostamenti, poi scambi tra i lavori più lunghi.
+    iterazioni = max_iterazioni if max_iterazioni is not None else 4 * len(compatibili) + 10
+    for _ in range(iterazioni if code else 0):
+        crit = max(code, key=lambda n: code[n].carico); qc = code[crit]; cmax = qc.carico
+        lunghi = sorted(qc.lavori, key=lambda l: -durate[crit][l])[:candidati]
+        mossa = None
+        for lav in lunghi:
+            k = chiave(lav)
+            for nome in compatibili[lav]:
+                if nome == crit: continue
+                qd = code[nome]
+                if qd.carico + durate[nome][lav] >= cmax - 1e-9: continue
+                if qd.ritardo_con(lav, k) > max(0.0, qd.ritardo, qc.ritardo): continue
+                mossa = (lav, nome); break
+            if mossa: break
+        if mossa:
+            lav, nome = mossa; qc.rimuovi(lav); code[nome].inserisci(lav, chiave(lav)); continue
+        for lav in lunghi:
+            for nome in compatibili[lav]:
+                if nome == crit: continue
+                qd = code[nome]
+                for altro in sorted(qd.lavori, key=lambda l: -durate[nome][l])[:candidati]:
+                    if crit not in compatibili[altro]: continue
+                    nc = qc.carico - durate[crit][lav] + durate[crit][altro]
+                    nd = qd.carico - durate[nome][altro] + durate[nome][lav]
+                    if max(nc, nd) >= cmax - 1e-9: continue
+                    limite = max(0.0, qc.ritardo, qd.ritardo)
+                    lc = sorted([x for x in qc.lavori if x is not lav] + [altro], key=chiave)
+                    ld = sorted([x for x in qd.lavori if x is not altro] + [lav], key=chiave)
+                    if _ritardo_massimo(lc, durate[crit], inizio_h) > limite: continue
+                    if _ritardo_massimo(ld, durate[nome], inizio_h) > limite: continue
+                    mossa = (lav, altro, nome); break
+                if mossa: break
+            if mossa: break
+        if not mossa: break
+        lav, altro, nome = mossa
+        qc.rimuovi(lav); code[nome].rimuovi(altro)
+        qc.inserisci(altro, chiave(altro)); code[nome].inserisci(lav, chiave(lav))
+
+    piano = {}; in_ritardo = []
+    for nome, q in code.items():
+        righe = []
+        for lav, fine in zip(q.lavori, q.fine):
+            righe.append((lav, fine - durate[nome][lav], fine))
+            if lav.scadenza_h is not None and fine > lav.scadenza_h + 1e-9: in_ritardo.append(lav.id)
+        piano[nome] = righe
+    return {
+        "macchine": piano,
+        "carico_h": {nome: q.carico for nome, q in code.items()},
+        "makespan_h": max((q.carico for q in code.values()), default=0.0),
+        "in_ritardo": in_ritardo,
+        "non_assegnabili": non_assegnabili,
+    }
+
+def carica_scadenze(percorso):
+    """Scadenze da un CSV con colonne riga (indice del lavoro nel catalogo, da 0) e scadenza_h
+    (ore dall'inizio turno); separatore , ; o tab. Restituisce {riga: scadenza_h}."""
+    with open(percorso, "r", encoding="utf-8-sig", newline="") as f:
+        campione = f.read(4096); f.seek(0)
+        try: dialetto = csv.Sniffer().sniff(campione, delimiters=",;\t")
+        except csv.Error: dialetto = csv.excel
+        reader = csv.DictReader(f, dialect=dialetto)
+        mancanti = [c for c in ("riga", "scadenza_h") if c not in (reader.fieldnames or ())]
+        if mancanti: raise ValueError(f"{percorso}: colonne mancanti: {', '.join(mancanti)}.")
+        scadenze = {}
+        for n, rec in enumerate(reader, start=2):
+            try:
+                riga = int(rec["riga"]); scadenze[riga] = _to_float(rec["scadenza_h"])
+                if riga < 0: raise ValueError
+            except (ValueError, TypeError):
+                raise ValueError(f"{percorso}: riga {n} non valida.") from None
+    return scadenze
+
+def ritardi_piano(piano):
+    """(lavori in ritardo, ritardo massimo in ore; 0 se nessuno) dalle code di un piano."""
+    ritardi = [fine - lav.scadenza_h for righe in piano.values() for lav, _, fine in righe
+               if lav.scadenza_h is not None]
+    in_ritardo = sum(1 for r in ritardi if r > 1e-9)
+    return in_ritardo, max([0.0] + ritardi)
+
+def pianifica_in_arrivo(lavori, macchine, inizio_h=0.0):
+    """Riferimento ingenuo: ogni lavoro, in ordine di arrivo, alla macchina compatibile che si libera prima."""
+    macchine = list(macchine); fine = {m.nome: inizio_h for m in macchine}; piano = {m.nome: [] for m in macchine}
+    for lav in lavori:
+        ok = [m for m in macchine if m.puo_stampare(lav)]
+        if not ok: continue
+        m = min(ok, key=lambda m: fine[m.nome] + m.tempo_h(lav))
+        inizio = fine[m.nome]; fine[m.nome] += m.tempo_h(lav); piano[m.nome].append((lav, inizio, fine[m.nome]))
+    return piano
+
+def pianifica_esatto(lavori, macchine, limite_nodi=2_000_000):
+    """Makespan ottimo per piccole istanze (branch and bound); ignora le scadenze. Per confronto."""
+    macchine = list(macchine); lavori = list(lavori)
+    dur = [[m.tempo_h(l) if m.puo_stampare(l) else None for m in macchine] for l in lavori]
+    if any(all(d is None for d in riga) for riga in dur): raise ValueError("Lavoro senza macchina compatibile.")
+    ordine = sorted(range(len(lavori)), key=lambda i: -min(d for d in dur[i] if d is not None))
+    migliore = [pianifica_produzione(lavori, macchine)["makespan_h"]]
+    carico = [0.0] * len(macchine); nodi = [0]
+    # due macchine sono intercambiabili solo se l'intero profilo coincide (velocità per passate, bianco, avviamento)
+    profilo = [(tuple(sorted(m.velocita.items())) if isinstance(m.velocita, dict) else m.velocita,
+                m.bianco, m.avviamento_h) for m in macchine]
+    # limite inferiore: lavoro restante più lungo e carico residuo distribuito al meglio
+    residuo = [0.0] * (len(ordine) + 1)
+    for k in range(len(ordine) - 1, -1, -1):
+        residuo[k] = residuo[k + 1] + min(d for d in dur[ordine[k]] if d is not None)
+
+    def cerca(k):
+        nodi[0] += 1
+        if nodi[0] > limite_nodi: raise RuntimeError("Istanza troppo grande per il solutore esatto.")
+        cmax = max(carico)
+        if k == len(ordine):
+            if cmax < migliore[0]: migliore[0] = cmax
+            return
+        if max(cmax, (sum(carico) + residuo[k]) / len(carico)) >= migliore[0] - 1e-12: return
+        i = ordine[k]; visti = set()
+        for j, d in enumerate(dur[i]):
+            if d is None: continue
+            firma = (carico[j], profilo[j])  # macchine equivalenti con lo stesso carico: basta provarne una
+            if firma in visti or carico[j] + d >= migliore[0] - 1e-12: continue
+            visti.add(firma)
+            carico[j] += d; cerca(k + 1); carico[j] -= d
+
+    cerca(0)
+    return migliore[0]
+
+def makespan_forza_bruta(lavori, macchine):
+    """Makespan ottimo provando tutte le assegnazioni (solo per pochissimi lavori): verifica di pianifica_esatto."""
+    macchine = list(macchine); lavori = list(lavori); migliore = _INF
+    dur = [[m.tempo_h(l) if m.puo_stampare(l) else None for m in macchine] for l in lavori]
+    for scelta in product(range(len(macchine)), repeat=len(lavori)):
+        carico = [0.0] * len(macchine)
+        for riga, j in zip(dur, scelta):
+            if riga[j] is None: break
+            carico[j] += riga[j]
+        else:
+            migliore = min(migliore, max(carico))
+    if migliore == _INF: raise ValueError("Lavoro senza macchina compatibile.")
+    return migliore
+
+def macchine_miste(rng, n=3):
+    """Macchine con profili diversi ma in parte coincidenti (stessa velocità a 1 o a 2 passate)."""
+    return [ProfiloMacchina(f"M-{k + 1}", {1: rng.choice((10.0, 20.0)), 2: rng.choice((8.0, 12.0))}, avviamento_min=5)
+            for k in range(n)]
+
+def lavori_piccoli(n, rng):
+    """Lavori di dimensioni simili, adatti alla verifica con la forza bruta."""
+    return [LavoroProduzione(i, rng.uniform(0.5, 3.0), rng.randint(1, 10), rng.randint(1, 4), rng.choice((0, 0, 1)), None)
+            for i in range(n)]
+
+def lavori_casuali(n, rng=None, con_scadenze=False):
+    rng = rng or random.Random()
+    lavori = []
+    for i in range(n):
+        area = rng.uniform(50, 1500) * rng.uniform(50, 1000) / 1e6
+        lav = LavoroProduzione(i, area, rng.choice((1, 5, 10, 25, 50, 100, 250)), rng.randint(1, 4),
+                               rng.choice((0, 0, 0, 1, 2)), None)
+        lavori.append(lav)
+    if con_scadenze:
+        for lav in lavori: lav.scadenza_h = rng.choice((None, 4.0, 8.0, 16.0))
+    return lavori
+
+def macchine_esempio():
+    return [
+        ProfiloMacchina("UV-1", {1: 40.0, 2: 24.0, 3: 16.0}, bianco=True, avviamento_min=5),
+        ProfiloMacchina("UV-2", {1: 40.0, 2: 24.0, 3: 16.0}, bianco=True, avviamento_min=5),
+        ProfiloMacchina("Eco-3", 30.0, bianco=False, avviamento_min=3),
+    ]
+
+def benchmark_pianificatore(istanze=30, n_lavori=9, n_grande=3000, seme=0, verifiche=100):
+    """Misura l'euristica su tre fronti.
+
+    - Solutore esatto: verificato contro la forza bruta su `verifiche` istanze da 6 lavori a profili misti.
+    - Makespan: confrontato con l'ottimo esatto su `istanze` istanze piccole *senza scadenze*
+      (il solutore esatto le ignora), quindi i rapporti riguardano solo il makespan.
+    - Scadenze: sulla coda grande (con scadenze) si confrontano lavori in ritardo e ritardo massimo
+      con un'assegnazione ingenua in ordine di arrivo (pianifica_in_arrivo).
+    """
+    rng = random.Random(seme); discrepanze = 0
+    for _ in range(verifiche):
+        miste = macchine_miste(rng); lavori = lavori_piccoli(6, rng)
+        if abs(pianifica_esatto(lavori, miste) - makespan_forza_bruta(lavori, miste)) > 1e-9: discrepanze += 1
+    macchine = macchine_esempio(); rapporti = []; t_eur = t_esatto = 0.0
+    for _ in range(istanze):
+        lavori = lavori_casuali(n_lavori, rng)
+        t0 = time.perf_counter(); h = pianifica_produzione(lavori, macchine)["makespan_h"]
+        t1 = time.perf_counter(); ott = pianifica_esatto(lavori, macchine); t2 = time.perf_counter()
+        t_eur += t1 - t0; t_esatto += t2 - t1
+        rapporti.append(h / ott if ott > 0 else 1.0)
+    # scadenze in proporzione al carico della coda (con 4-16 h fisse una coda grande sarebbe tutta in ritardo)
+    grande = lavori_casuali(n_grande, rng)
+    orizzonte = sum(min(m.tempo_h(l) for m in macchine if m.puo_stampare(l)) for l in grande) / len(macchine)
+    for lav in grande:
+        f = rng.choice((None, 0.25, 0.5, 1.0, 1.2)); lav.scadenza_h = None if f is None else f * orizzonte
+    t0 = time.perf_counter(); piano = pianifica_produzione(grande, macchine); t_grande = time.perf_counter() - t0
+    in_ritardo, ritardo_max = ritardi_piano(piano["macchine"])
+    in_ritardo_arrivo, ritardo_max_arrivo = ritardi_piano(pianifica_in_arrivo(grande, macchine))
+    return {
+        "verifiche_esatto": verifiche, "discrepanze_esatto": discrepanze,
+        "istanze": istanze, "lavori_per_istanza": n_lavori,
+        "rapporto_makespan_medio": sum(rapporti) / len(rapporti), "rapporto_makespan_peggiore": max(rapporti),
+        "ottimi_trovati": sum(1 for r in rapporti if r <= 1 + 1e-9),
+        "ms_euristica": t_eur / istanze * 1000, "ms_esatto": t_esatto / istanze * 1000,
+        "lavori_coda_grande": n_grande, "ms_coda_grande": t_grande * 1000,
+        "makespan_coda_grande_h": piano["makespan_h"],
+        "in_ritardo_coda_grande": in_ritardo, "ritardo_max_coda_grande_h": ritardo_max,
+        "in_ritardo_in_arrivo": in_ritardo_arrivo, "ritardo_max_in_arrivo_h": ritardo_max_arrivo,
+    }
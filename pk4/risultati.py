@@ -0,0 +1,238 @@
+"""Risultati compatti (Preventivo, TabellaPreventivi) e riprezzo incrementale."""
+from array import array
+
+from .core import DEFAULT_PARAMETRI, _componenti_costo, eur, format_it, valida_lavoro
+
+# =============================== RISULTATI COMPATTI ===============================
+
+# Chiavi del dict di breakdown_costo, nello stesso ordine (report e calcolo le leggono per chiave).
+CAMPI_RISULTATO = (
+    "area_mq", "consumo_cmyk_l", "consumo_w_l", "costo_cmyk", "costo_w", "costi_vari",
+    "costo_prestampa_unit", "costo_per_pezzo", "totale_commessa", "costo_al_mq",
+    "quantita", "w_level", "cmyk_level", "moltiplicatore_costi",
+)
+_CAMPI_RISULTATO_SET = frozenset(CAMPI_RISULTATO)
+
+# Colonne memorizzate con il loro typecode di array: costo/pz, totale, €/mq e moltiplicatore si ricavano.
+COLONNE_TABELLA = (
+    ("area_mq", "d"), ("consumo_cmyk_l", "d"), ("consumo_w_l", "d"),
+    ("costo_cmyk", "d"), ("costo_w", "d"), ("costi_vari", "d"), ("costo_prestampa_unit", "d"),
+    ("quantita", "I"), ("cmyk_level", "B"), ("w_level", "B"),
+)
+_NOMI_COLONNE = tuple(nome for nome, _ in COLONNE_TABELLA)
+
+class _CampiPreventivo:
+    """Campi derivati e accesso per chiave (come il dict di breakdown_costo)."""
+    __slots__ = ()
+
+    @property
+    def costo_per_pezzo(self):
+        return self.costo_cmyk + self.costo_w + self.costi_vari + self.costo_prestampa_unit
+
+    @property
+    def totale_commessa(self): return self.costo_per_pezzo * self.quantita
+
+    @property
+    def costo_al_mq(self):
+        area = self.area_mq
+        return (self.costo_per_pezzo / area) if area > 0 else 0.0
+
+    @property
+    def moltiplicatore_costi(self): return float(self.w_level + 1)
+
+    def __getitem__(self, key):
+        if key not in _CAMPI_RISULTATO_SET: raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key): return key in _CAMPI_RISULTATO_SET
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in _CAMPI_RISULTATO_SET else default
+
+    def keys(self): return CAMPI_RISULTATO
+
+    def as_dict(self):
+        return {k: getattr(self, k) for k in CAMPI_RISULTATO}
+
+    def __repr__(self):
+        return f"{type(self).__name__}(" + ", ".join(f"{k}={getattr(self, k)!r}" for k in _NOMI_COLONNE) + ")"
+
+class Preventivo(_CampiPreventivo):
+    """Singolo preventivo compatto (__slots__), leggibile come details['chiave']."""
+    __slots__ = _NOMI_COLONNE
+
+    def __init__(self, area_mq, consumo_cmyk_l, consumo_w_l, costo_cmyk, costo_w, costi_vari,
+                 costo_prestampa_unit, quantita, cmyk_level, w_level):
+        self.area_mq = area_mq; self.consumo_cmyk_l = consumo_cmyk_l; self.consumo_w_l = consumo_w_l
+        self.costo_cmyk = costo_cmyk; self.costo_w = costo_w; self.costi_vari = costi_vari
+        self.costo_prestampa_unit = costo_prestampa_unit
+        self.quantita = int(quantita); self.cmyk_level = int(cmyk_level); self.w_level = int(w_level)
+
+def preventivo(parametri, lung_mm, larg_mm, quantita, cmyk_level, w_level):
+    """Come breakdown_costo ma restituisce un Preventivo invece di un dict da 14 chiavi."""
+    # i risultati compatti memorizzano quantità e livelli come interi: valori frazionari vengono rifiutati
+    lung_mm, larg_mm, quantita, cmyk_level, w_level = valida_lavoro(lung_mm, larg_mm, quantita, cmyk_level, w_level)
+    return Preventivo(*_componenti_costo(parametri, lung_mm, larg_mm, quantita, cmyk_level, w_level),
+                      quantita, cmyk_level, w_level)
+
+class RigaPreventivo(_CampiPreventivo):
+    """Vista su una riga di TabellaPreventivi: legge direttamente dalle colonne."""
+    __slots__ = ("_colonne", "_i")
+
+    def __init__(self, colonne, i):
+        self._colonne = colonne; self._i = i
+
+    def __getattr__(self, nome):
+        try: col = self._colonne[nome]
+        except KeyError: raise AttributeError(nome) from None
+        return col[self._i]
+
+class TabellaPreventivi:
+    """Lotto di preventivi in colonne tipizzate; slicing e righe sono viste senza copia."""
+    __slots__ = ("_colonne", "_n")
+
+    def __init__(self, colonne):
+        self._colonne = {}; n = None
+        for nome, tipo in COLONNE_TABELLA:
+            mv = memoryview(colonne[nome])
+            if mv.format != tipo or mv.ndim != 1:
+                raise ValueError(f"Colonna '{nome}': atteso formato '{tipo}', trovato '{mv.format}'.")
+            if n is None: n = len(mv)
+            elif len(mv) != n:
+                raise ValueError(f"Colonna '{nome}': {len(mv)} righe invece di {n}.")
+            self._colonne[nome] = mv
+        self._n = n or 0
+
+    @classmethod
+    def calcola(cls, parametri, lavori):
+        """Prezza un iterabile di (lung_mm, larg_mm, quantita, cmyk_level, w_level)."""
+        cols = {nome: array(tipo) for nome, tipo in COLONNE_TABELLA}
+        app = [cols[nome].append for nome in _NOMI_COLONNE]
+        for lavoro in lavori:
+            lung, larg, qta, cmyk, w = valida_lavoro(*lavoro)
+            valori = _componenti_costo(parametri, lung, larg, qta, cmyk, w)
+            for a, v in zip(app, valori): a(v)
+            app[7](qta); app[8](cmyk); app[9](w)
+        return cls(cols)
+
+    @classmethod
+    def da_preventivi(cls, preventivi):
+        cols = {nome: array(tipo) for nome, tipo in COLONNE_TABELLA}
+        for p in preventivi:
+            for nome in _NOMI_COLONNE: cols[nome].append(p[nome])
+        return cls(cols)
+
+    def __len__(self): return self._n
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return TabellaPreventivi({k: v[idx] for k, v in self._colonne.items()})
+        if idx < 0: idx += self._n
+        if not 0 <= idx < self._n: raise IndexError("indice di riga fuori intervallo")
+        return RigaPreventivo(self._colonne, idx)
+
+    def __iter__(self):
+        cols = self._colonne
+        for i in range(self._n): yield RigaPreventivo(cols, i)
+
+    def colonna(self, nome):
+        """Colonna memorizzata come memoryview (senza copia) o colonna derivata come array('d')."""
+        if nome in self._colonne: return self._colonne[nome]
+        if nome not in _CAMPI_RISULTATO_SET: raise KeyError(nome)
+        c = self._colonne
+        cpp = array("d", map(lambda a, b, d, e: a + b + d + e,
+                             c["costo_cmyk"], c["costo_w"], c["costi_vari"], c["costo_prestampa_unit"]))
+        if nome == "costo_per_pezzo": return cpp
+        if nome == "totale_commessa": return array("d", map(float.__mul__, cpp, map(float, c["quantita"])))
+        if nome == "costo_al_mq": return array("d", ((x / a) if a > 0 else 0.0 for x, a in zip(cpp, c["area_mq"])))
+        return array("d", (float(w + 1) for w in c["w_level"]))  # moltiplicatore_costi
+
+    def somma(self, nome):
+        return sum(self.colonna(nome))
+
+    def riprezza(self, parametri_vecchi, parametri_nuovi):
+        return riprezza_tabella(self, parametri_vecchi, parametri_nuovi)
+
+    @property
+    def nbytes(self):
+        return sum(mv.nbytes for mv in self._colonne.values())
+
+# =============================== RIPREZZO INCREMENTALE ===============================
+
+# Parametro -> colonne che ne dipendono (M/Y/K e volume annuo non entrano in breakdown_costo).
+DIPENDENZE_PARAMETRI = {
+    "costo_C_litro": ("costo_cmyk",),
+    "consumo_CMYK_mq": ("consumo_cmyk_l", "costo_cmyk"),
+    "costo_W_litro": ("costo_w",),
+    "consumo_W_mq": ("consumo_w_l", "costo_w"),
+    "costi_vari_operatore_mq": ("costi_vari",),
+    "investimento_mq": ("costi_vari",),
+    "assistenza_ricambi_mq": ("costi_vari",),
+    "costo_orario_prestampa": ("costo_prestampa_unit",),
+}
+
+_COMPONENTI_COSTO = ("costo_cmyk", "costo_w", "costi_vari", "costo_prestampa_unit")
+
+def _ricalcola_colonna(c, nome, parametri):
+    """Ricalcola una colonna dalle colonne memorizzate, con la stessa aritmetica di _componenti_costo."""
+    if nome == "consumo_cmyk_l":
+        k = float(parametri["consumo_CMYK_mq"])
+        return array("d", ((k * a * l) if l > 0 else 0.0 for a, l in zip(c["area_mq"], c["cmyk_level"])))
+    if nome == "consumo_w_l":
+        k = float(parametri["consumo_W_mq"])
+        return array("d", ((k * a * l) if l > 0 else 0.0 for a, l in zip(c["area_mq"], c["w_level"])))
+    if nome == "costo_cmyk":
+        return array("d", map(float(parametri["costo_C_litro"]).__mul__, c["consumo_cmyk_l"]))
+    if nome == "costo_w":
+        return array("d", map(float(parametri["costo_W_litro"]).__mul__, c["consumo_w_l"]))
+    if nome == "costi_vari":
+        base = float(parametri["costi_vari_operatore_mq"] + parametri["investimento_mq"] + parametri["assistenza_ricambi_mq"])
+        return array("d", (base * a * float(w + 1) for a, w in zip(c["area_mq"], c["w_level"])))
+    if nome == "costo_prestampa_unit":
+        return array("d", map(float(parametri["costo_orario_prestampa"]).__truediv__, c["quantita"]))
+    raise KeyError(nome)
+
+def _somma_per_quantita(col, quantita):
+    return sum(map(float.__mul__, col, map(float, quantita)))
+
+def parametri_cambiati(parametri_vecchi, parametri_nuovi):
+    return [k for k in DEFAULT_PARAMETRI if parametri_vecchi.get(k) != parametri_nuovi.get(k)]
+
+def riprezza_tabella(tabella, parametri_vecchi, parametri_nuovi):
+    """Aggiorna solo le colonne toccate dai parametri cambiati e restituisce l'impatto.
+    Le colonne scrivibili sono aggiornate in place, quelle in sola lettura sostituite."""
+    cambiati = parametri_cambiati(parametri_vecchi, parametri_nuovi)
+    toccate = {nome for k in cambiati for nome in DIPENDENZE_PARAMETRI.get(k, ())}
+    c = tabella._colonne; q = c["quantita"]
+    per_componente = {nome: _somma_per_quantita(c[nome], q) for nome in _COMPONENTI_COSTO}
+    totale_prima = sum(per_componente.values())
+    componenti = {}
+    for nome in _NOMI_COLONNE:  # consumi prima dei costi che ne dipendono
+        if nome not in toccate: continue
+        nuova = _ricalcola_colonna(c, nome, parametri_nuovi)
+        variate = sum(1 for a, b in zip(c[nome], nuova) if a != b)
+        if c[nome].readonly: c[nome] = memoryview(nuova)  # es. catalogo in sola lettura: la colonna nuova resta in memoria
+        else: c[nome][:] = nuova
+        if nome in per_componente:
+            dopo = _somma_per_quantita(nuova, q)
+            componenti[nome] = {"totale_prima": per_componente[nome], "totale_dopo": dopo, "righe_variate": variate}
+            per_componente[nome] = dopo
+    totale_dopo = sum(per_componente.values())
+    return {
+        "parametri": cambiati,
+        "righe": len(tabella),
+        "componenti": componenti,
+        "totale_prima": totale_prima,
+        "totale_dopo": totale_dopo,
+        "delta": totale_dopo - totale_prima,
+        "delta_pct": ((totale_dopo - totale_prima) / totale_prima * 100.0) if totale_prima else 0.0,
+    }
+
+def formatta_impatto(impatto):
+    righe = [f"Preventivi ricalcolati: {format_it(impatto['righe'], 0)}"]
+    for nome, comp in impatto["componenti"].items():
+        righe.append(f"{nome}: {eur(comp['totale_prima'])} → {eur(comp['totale_dopo'])}"
+                     f" ({format_it(comp['righe_variate'], 0)} righe variate)")
+    righe.append(f"Totale commesse: {eur(impatto['totale_prima'])} → {eur(impatto['totale_dopo'])}"
+                 f" ({'+' if impatto['delta'] >= 0 else ''}{format_it(impatto['delta_pct'], 2)}%)")
+    return "\n".join(righe)
@@ -0,0 +1,29 @@
+import random
+from array import array
+
+import pytest
+
+from pk4 import DEFAULT_PARAMETRI
+from pk4.catalogo import COLONNE_LAVORO, scrivi_catalogo
+
+@pytest.fixture
+def parametri():
+    """DEFAULT_PARAMETRI come float, una copia nuova per ogni test."""
+    return {k: float(v) for k, v in DEFAULT_PARAMETRI.items()}
+
+@pytest.fixture
+def genera_lavori():
+    """Fabbrica di lavori casuali riproducibili (lung_mm, larg_mm, quantita, cmyk_level, w_level)."""
+    def genera(n, seme=0, mm=(1, 2000), max_quantita=500, max_cmyk=6, max_w=6):
+        rng = random.Random(seme)
+        return [(rng.uniform(*mm), rng.uniform(*mm), rng.randint(1, max_quantita), rng.randint(0, max_cmyk),
+                 rng.randint(0, max_w)) for _ in range(n)]
+    return genera
+
+@pytest.fixture
+def scrivi_lavori():
+    """Scrive un catalogo .pk4c di soli lavori da una lista di tuple."""
+    def scrivi(percorso, lavori):
+        scrivi_catalogo(str(percorso), {nome: array(tipo, (lav[i] for lav in lavori))
+                                        for i, (nome, tipo) in enumerate(COLONNE_LAVORO)})
+    return scrivi
@@ -0,0 +1,19 @@
+import json
+
+from pk4.carico import esegui_rampa, lavori_sintetici, percentile, salva_risultati
+
+def test_percentile_nearest_rank():
+    valori = list(range(1, 101))
+    assert percentile(valori, 50) == 50 and percentile(valori, 99) == 99 and percentile(valori, 100) == 100
+    assert percentile([], 95) == 0.0
+
+def test_salvataggi_nello_stesso_secondo_non_si_sovrascrivono(tmp_path, monkeypatch):
+    monkeypatch.setattr("pk4.carico.time.strftime", lambda fmt, *a: "20260101-120000")
+    percorsi = [salva_risultati({"n": i}, str(tmp_path)) for i in range(3)]
+    assert len(set(percorsi)) == 3
+    assert [json.loads(open(p, encoding="utf-8").read())["n"] for p in percorsi] == [0, 1, 2]
+
+def test_rampa_in_process(parametri):
+    esito = esegui_rampa(("inprocess", parametri), lavori_sintetici("misto", 50), livelli=(1, 2), richieste=200)
+    assert [r["concorrenza"] for r in esito["livelli"]] == [1, 2]
+    assert all(r["richieste"] == 200 and r["errori"] == 0 for r in esito["livelli"])
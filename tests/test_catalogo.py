@@ -0,0 +1,93 @@
+import pytest
+
+from pk4 import COLONNE_TABELLA, TabellaPreventivi
+from pk4.catalogo import CatalogoMappato, catalogo_a_csv, csv_a_catalogo, prezza_catalogo
+
+def test_scrittura_e_mappatura(tmp_path, genera_lavori, scrivi_lavori):
+    lavori = genera_lavori(300, seme=2); percorso = str(tmp_path / "lavori.pk4c")
+    scrivi_lavori(percorso, lavori)
+    with CatalogoMappato(percorso) as cat:
+        assert len(cat) == 300 and not cat.prezzato and cat.impronta == ""
+        assert list(cat.lavori()) == lavori
+
+def test_prezza_catalogo_uguale_a_calcola(tmp_path, parametri, genera_lavori, scrivi_lavori):
+    lavori = genera_lavori(500, seme=2); src = str(tmp_path / "lavori.pk4c"); out = str(tmp_path / "prezzato.pk4c")
+    scrivi_lavori(src, lavori)
+    assert prezza_catalogo(parametri, src, out) == 500
+    rif = TabellaPreventivi.calcola(parametri, lavori)
+    with CatalogoMappato(out) as cat:
+        assert cat.aggiornato(parametri) and not cat.aggiornato(dict(parametri, costo_W_litro=1.0))
+        for nome, _ in COLONNE_TABELLA:
+            assert list(cat.colonne[nome]) == list(rif.colonna(nome)), nome
+
+def test_andata_e_ritorno_csv(tmp_path, monkeypatch, parametri, genera_lavori, scrivi_lavori):
+    monkeypatch.setattr("pk4.catalogo._RIGHE_PER_BLOCCO", 64)  # più blocchi anche con pochi lavori
+    src = str(tmp_path / "lavori.pk4c"); prezzato = str(tmp_path / "prezzato.pk4c")
+    scrivi_lavori(src, genera_lavori(200, seme=2)); prezza_catalogo(parametri, src, prezzato)
+    csv_out = str(tmp_path / "prezzato.csv"); ritorno = str(tmp_path / "ritorno.pk4c")
+    assert catalogo_a_csv(prezzato, csv_out) == 200
+    assert csv_a_catalogo(csv_out, ritorno) == 200
+    with CatalogoMappato(prezzato) as a, CatalogoMappato(ritorno) as b:
+        assert a.schema == b.schema
+        for nome, _ in a.schema:
+            assert list(a.colonne[nome]) == list(b.colonne[nome]), nome
+        # i costi importati non hanno impronta: vanno riprezzati prima di fidarsi
+        assert b.prezzato and b.impronta == "" and not b.aggiornato(parametri)
+
+def test_csv_con_separatore_e_decimali_italiani(tmp_path):
+    percorso = tmp_path / "lavori.csv"
+    percorso.write_text("lung_mm;larg_mm;quantita;cmyk_level;w_level\n100,5;200;3;1;0\n", encoding="utf-8")
+    assert csv_a_catalogo(str(percorso), str(tmp_path / "c.pk4c")) == 1
+    with CatalogoMappato(str(tmp_path / "c.pk4c")) as cat:
+        assert list(cat.lavori()) == [(100.5, 200.0, 3, 1, 0)]
+
+def test_riprezzo_in_sola_lettura_non_tocca_il_file(tmp_path, parametri, genera_lavori, scrivi_lavori):
+    lavori = genera_lavori(300, seme=2); src = str(tmp_path / "lavori.pk4c"); out = tmp_path / "prezzato.pk4c"
+    scrivi_lavori(src, lavori); prezza_catalogo(parametri, src, str(out))
+    prima = out.read_bytes(); nuovi = dict(parametri, costo_W_litro=250.0, consumo_CMYK_mq=0.007)
+    with CatalogoMappato(str(out)) as cat:
+        cat.riprezza(parametri, nuovi)
+        assert cat.aggiornato(nuovi)
+        rif = TabellaPreventivi.calcola(nuovi, lavori)
+        for nome, _ in COLONNE_TABELLA:
+            assert list(cat.tabella().colonna(nome)) == list(rif.colonna(nome)), nome
+    assert out.read_bytes() == prima
+    with CatalogoMappato(str(out)) as cat:
+        assert cat.aggiornato(parametri)
+
+def test_riprezzo_in_scrittura_aggiorna_il_file(tmp_path, parametri, genera_lavori, scrivi_lavori):
+    lavori = genera_lavori(100, seme=2); src = str(tmp_path / "lavori.pk4c"); out = str(tmp_path / "prezzato.pk4c")
+    scrivi_lavori(src, lavori); prezza_catalogo(parametri, src, out)
+    nuovi = dict(parametri, costi_vari_operatore_mq=3.0)
+    with CatalogoMappato(out, scrittura=True) as cat: cat.riprezza(parametri, nuovi)
+    with CatalogoMappato(out) as cat:
+        assert cat.aggiornato(nuovi)
+        assert list(cat.colonne["costi_vari"]) == list(TabellaPreventivi.calcola(nuovi, lavori).colonna("costi_vari"))
+
+def test_file_non_catalogo(tmp_path):
+    percorso = tmp_path / "x.pk4c"; percorso.write_bytes(b"non sono un catalogo" * 10)
+    with pytest.raises(ValueError):
+        CatalogoMappato(str(percorso))
+
+@pytest.mark.parametrize("riga", ["100;200;2,5;1;0", "0;200;3;1;0", "100;200;0;1;0", "100;-1;3;1;0",
+                                  "100;200;3;1,5;0", "100;200;3;1;-1", "nan;200;3;1;0", "100;200;x;1;0"])
+def test_csv_riga_non_valida_rifiutata_con_numero_di_riga(tmp_path, riga):
+    percorso = tmp_path / "lavori.csv"
+    percorso.write_text(f"lung_mm;larg_mm;quantita;cmyk_level;w_level\n100;200;3;1;0\n{riga}\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="riga 3 non valida"):
+        csv_a_catalogo(str(percorso), str(tmp_path / "c.pk4c"))
+    assert not (tmp_path / "c.pk4c").exists()
+
+def test_riprezzo_in_sola_lettura_copia_solo_le_colonne_toccate(tmp_path, parametri, genera_lavori, scrivi_lavori):
+    src = str(tmp_path / "lavori.pk4c"); out = str(tmp_path / "prezzato.pk4c")
+    scrivi_lavori(src, genera_lavori(50, seme=2)); prezza_catalogo(parametri, src, out)
+    with CatalogoMappato(out) as cat:
+        impatto = cat.riprezza(parametri, dict(parametri, costo_C_litro=90.0))
+        in_memoria = {nome for nome, col in cat.colonne.items() if not col.readonly}
+        assert in_memoria == {"costo_cmyk"} and set(impatto["componenti"]) == {"costo_cmyk"}
+
+def test_prezza_catalogo_segnala_avanzamento(tmp_path, monkeypatch, parametri, genera_lavori, scrivi_lavori):
+    monkeypatch.setattr("pk4.catalogo._RIGHE_PER_BLOCCO", 40)
+    src = str(tmp_path / "lavori.pk4c"); scrivi_lavori(src, genera_lavori(100, seme=2)); frazioni = []
+    prezza_catalogo(parametri, src, str(tmp_path / "prezzato.pk4c"), avanzamento=frazioni.append)
+    assert frazioni == [0.4, 0.8, 1.0]
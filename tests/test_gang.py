@@ -0,0 +1,64 @@
+import random
+
+import pytest
+
+from pk4 import TabellaPreventivi, cli
+from pk4.catalogo import CatalogoMappato, prezza_catalogo
+from pk4.gang import MAX_LAVORI_RUN, MAX_MQ_RUN, _riempi_run, raggruppa_gang_run
+
+@pytest.fixture
+def lavori_gang(genera_lavori):
+    """Lavori con pochi setup, così ogni classe ha abbastanza lavori da raggruppare."""
+    return lambda n: genera_lavori(n, seme=4, mm=(100, 1500), max_quantita=50, max_cmyk=2, max_w=1)
+
+def test_riempi_run_rispetta_i_limiti():
+    rng = random.Random(0)
+    voci = [(rng.uniform(0.1, 10.0), i) for i in range(500)]
+    mq = dict((i, m) for m, i in voci)
+    run = _riempi_run(voci, 25.0, 4)
+    assert sorted(i for r in run for i in r) == list(range(500))
+    assert all(len(r) <= 4 and sum(mq[i] for i in r) <= 25.0 + 1e-9 for r in run)
+
+def test_gang_run_conserva_i_costi(parametri, lavori_gang):
+    tab = TabellaPreventivi.calcola(parametri, lavori_gang(300))
+    esito = raggruppa_gang_run(parametri, enumerate(tab), max_mq_run=50.0)
+    singoli = sum(r["costo_singolo"] for r in esito["lavori"].values())
+    gang = sum(r["costo_gang"] for r in esito["lavori"].values())
+    assert esito["risparmio_totale"] == pytest.approx(singoli - gang)
+    prestampe = sum(r["prestampa"] for r in esito["run"])
+    # ogni run paga una sola prestampa al posto di quelle dei singoli lavori
+    assert gang == pytest.approx(tab.somma("totale_commessa") + prestampe
+                                 - sum(d["costo_prestampa_unit"] * d["quantita"] for d in tab))
+
+def test_cli_gang_ricalcola_catalogo_non_aggiornato(tmp_path, monkeypatch, capsys, parametri, lavori_gang,
+                                                    scrivi_lavori):
+    lavori = lavori_gang(100); src = str(tmp_path / "lavori.pk4c"); cat = tmp_path / "prezzato.pk4c"
+    scrivi_lavori(src, lavori)
+    prezza_catalogo(parametri, src, str(cat)); prima = cat.read_bytes()
+    nuovi = dict(parametri, costo_orario_prestampa=40.0, costo_C_litro=90.0)
+    monkeypatch.setattr(cli, "carica_parametri", lambda: dict(nuovi))
+    assert cli.main(["gang", str(cat), "--max-mq", "30"]) == 0
+    out = capsys.readouterr()
+    assert "parametri diversi" in out.err
+    atteso = raggruppa_gang_run(nuovi, enumerate(TabellaPreventivi.calcola(nuovi, lavori)), 30.0)
+    assert cli.eur(atteso["risparmio_totale"]) in out.out
+    assert cat.read_bytes() == prima
+    with CatalogoMappato(str(cat)) as c: assert c.aggiornato(parametri)
+
+def test_id_duplicati_rifiutati(parametri):
+    d = TabellaPreventivi.calcola(parametri, [(500, 500, 10, 1, 0)])[0]
+    with pytest.raises(ValueError, match="duplicato"):
+        raggruppa_gang_run(parametri, [("a", d), ("a", d)])
+
+def test_serve_un_limite_di_capacita(parametri, lavori_gang):
+    tab = TabellaPreventivi.calcola(parametri, lavori_gang(20))
+    with pytest.raises(ValueError):
+        raggruppa_gang_run(parametri, enumerate(tab), None, None)
+
+def test_limiti_di_default(parametri, lavori_gang):
+    tab = TabellaPreventivi.calcola(parametri, lavori_gang(2000))
+    esito = raggruppa_gang_run(parametri, enumerate(tab))
+    assert all(len(r["lavori"]) <= MAX_LAVORI_RUN for r in esito["run"])
+    # lavori più grandi di una run restano da soli; le altre run rispettano il limite di mq
+    assert all(r["mq"] <= MAX_MQ_RUN + 1e-9 or len(r["lavori"]) == 1 for r in esito["run"])
+    assert 0 < esito["risparmio_totale"] < 0.5 * tab.somma("totale_commessa")
@@ -0,0 +1,92 @@
+import json
+import os
+
+import pytest
+
+from pk4 import preventivo
+from pk4 import hotfolder
+from pk4.hotfolder import CartellaCalda, TicketNonValido, prezza_ticket
+
+TICKET = {"lung_mm": 500, "larg_mm": 300.5, "quantita": 10, "cmyk_level": 2, "w_level": 1}
+
+def test_ticket_valido(parametri):
+    r = prezza_ticket(parametri, dict(TICKET, id="A-1"))
+    assert r["id"] == "A-1"
+    assert r["totale_commessa"] == preventivo(parametri, 500, 300.5, 10, 2, 1)["totale_commessa"]
+    assert prezza_ticket(parametri, {"lung_mm": "500", "larg_mm": 300, "quantita": 3.0})["w_level"] == 0
+
+@pytest.mark.parametrize("modifiche", [
+    {"lung_mm": float("nan")}, {"larg_mm": float("inf")}, {"lung_mm": 0}, {"larg_mm": -10},
+    {"quantita": 2.5}, {"quantita": 0}, {"quantita": -3}, {"quantita": float("inf")}, {"quantita": True},
+    {"cmyk_level": -1}, {"w_level": -2}, {"cmyk_level": 1.5}, {"w_level": "x"}, {"lung_mm": None},
+])
+def test_ticket_non_valido(modifiche, parametri):
+    with pytest.raises(TicketNonValido):
+        prezza_ticket(parametri, dict(TICKET, **modifiche))
+
+def test_campo_mancante(parametri):
+    with pytest.raises(TicketNonValido, match="quantita"):
+        prezza_ticket(parametri, {"lung_mm": 1, "larg_mm": 1})
+
+@pytest.fixture
+def cartella_calda(tmp_path, monkeypatch, parametri):
+    """Fabbrica di CartellaCalda su una cartella temporanea, con parametri fissi."""
+    monkeypatch.setattr(hotfolder, "carica_parametri", lambda: dict(parametri))
+    monkeypatch.setattr(hotfolder, "PERCORSO_FILE_CONFIG", str(tmp_path / "nessuna-config.json"))
+    cartella = tmp_path / "ticket"; cartella.mkdir()
+    return lambda **kw: (cartella, CartellaCalda(str(cartella), stabilita_s=0.0, **kw))
+
+def test_prezza_e_scarta(cartella_calda, monkeypatch):
+    cartella, cc = cartella_calda()
+    (cartella / "buono.json").write_text(json.dumps(TICKET), encoding="utf-8")
+    (cartella / "cattivo.json").write_text(json.dumps(dict(TICKET, quantita=-1)), encoding="utf-8")
+    assert cc.elabora_una_volta() == {"prezzati": 1, "riprovati": 0, "scartati": 1}
+    assert (cartella / "buono.risultato.json").exists()
+    assert (cartella / "scarti" / "cattivo.json").exists() and (cartella / "scarti" / "cattivo.errore.json").exists()
+
+def test_errore_di_scrittura_non_ferma_il_demone(cartella_calda, monkeypatch):
+    cartella, cc = cartella_calda(attesa_base_s=0.0)
+    (cartella / "t.json").write_text(json.dumps(TICKET), encoding="utf-8")
+    originale = hotfolder.scrivi_json_atomico
+    def disco_pieno(percorso, dati): raise OSError(28, "No space left on device")
+    monkeypatch.setattr(hotfolder, "scrivi_json_atomico", disco_pieno)
+    assert cc.elabora_una_volta()["riprovati"] == 1
+    assert (cartella / "t.json").exists() and not (cartella / "t.risultato.json").exists()
+    monkeypatch.setattr(hotfolder, "scrivi_json_atomico", originale)
+    assert cc.elabora_una_volta()["prezzati"] == 1
+    assert (cartella / "t.risultato.json").exists()
+    assert not [n for n in os.listdir(cartella) if n.endswith(".tmp")]
+
+def test_errore_di_scrittura_negli_scarti(cartella_calda, monkeypatch):
+    cartella, cc = cartella_calda()
+    (cartella / "c.json").write_text(json.dumps(dict(TICKET, lung_mm="nan")), encoding="utf-8")
+    def disco_pieno(percorso, dati): raise OSError(28, "No space left on device")
+    monkeypatch.setattr(hotfolder, "scrivi_json_atomico", disco_pieno)
+    assert cc.elabora_una_volta()["scartati"] == 1
+    assert (cartella / "scarti" / "c.json").exists()
+
+def test_esegui_sopravvive_agli_errori_di_sistema(cartella_calda, monkeypatch):
+    _, cc = cartella_calda()
+    giri = iter([OSError("cartella irraggiungibile"), {"prezzati": 0}, KeyboardInterrupt()])
+    def giro():
+        esito = next(giri)
+        if isinstance(esito, BaseException): raise esito
+        return esito
+    monkeypatch.setattr(cc, "elabora_una_volta", giro)
+    cc.esegui(intervallo_s=0.0)
+    assert next(giri, None) is None
+
+def test_errori_di_scrittura_non_portano_agli_scarti(cartella_calda, monkeypatch):
+    cartella, cc = cartella_calda(attesa_base_s=0.0, tentativi=2)
+    ticket = cartella / "t.json"; ticket.write_text(json.dumps(TICKET), encoding="utf-8")
+    originale = hotfolder.scrivi_json_atomico
+    def disco_pieno(percorso, dati): raise OSError(28, "No space left on device")
+    monkeypatch.setattr(hotfolder, "scrivi_json_atomico", disco_pieno)
+    for _ in range(3):
+        assert cc.elabora_una_volta()["riprovati"] == 1
+    monkeypatch.setattr(hotfolder, "scrivi_json_atomico", originale)
+    ticket.write_text(json.dumps(TICKET)[:-5], encoding="utf-8")  # una lettura a metà copia
+    assert cc.elabora_una_volta() == {"prezzati": 0, "riprovati": 1, "scartati": 0}
+    ticket.write_text(json.dumps(TICKET), encoding="utf-8")
+    assert sum(cc.elabora_una_volta()["prezzati"] for _ in range(2)) == 1
+    assert (cartella / "t.risultato.json").exists() and not (cartella / "scarti" / "t.json").exists()
@@ -0,0 +1,32 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+RADICE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# budget largo rispetto ai 10 ms di benchmarks/bench_import.py: qui conta accorgersi delle regressioni grosse
+BUDGET_MS = 30.0
+
+def _esegui(codice, *opzioni):
+    return subprocess.run([sys.executable, *opzioni, "-c", codice], cwd=RADICE, capture_output=True, text=True,
+                          check=True)
+
+@pytest.mark.parametrize("moduli", [
+    "pk4",
+    "pk4, pk4.cli, pk4.catalogo, pk4.produzione, pk4.gang, pk4.hotfolder, pk4.carico",
+])
+def test_import_senza_tkinter(moduli):
+    r = _esegui(f"import sys, {moduli}\n"
+                "pk4.breakdown_costo(pk4.DEFAULT_PARAMETRI, 100, 100, 1, 1, 0)\n"
+                "print(sorted(m for m in ('tkinter', '_tkinter', 'pk4.gui') if m in sys.modules))")
+    assert r.stdout.strip() == "[]"
+
+def test_tempo_di_import():
+    tempi = []
+    for _ in range(5):
+        r = _esegui("import pk4", "-X", "importtime")
+        righe = [p.split("|") for p in r.stderr.splitlines()]
+        tempi += [int(p[1]) / 1000.0 for p in righe if len(p) == 3 and p[2].strip() == "pk4"]
+    assert tempi, "riga di importtime per 'pk4' non trovata"
+    assert min(tempi) < BUDGET_MS, f"import pk4: {min(tempi):.1f} ms (budget {BUDGET_MS} ms)"
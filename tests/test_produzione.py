@@ -0,0 +1,51 @@
+import random
+
+import pytest
+
+from pk4 import cli
+from pk4.produzione import (ProfiloMacchina, lavori_piccoli, macchine_esempio, macchine_miste, makespan_forza_bruta,
+                            pianifica_esatto, pianifica_in_arrivo, pianifica_produzione, ritardi_piano)
+
+def test_esatto_con_profili_misti_uguale_alla_forza_bruta():
+    # stessa velocità a 2 passate ma non a 1: le macchine non sono intercambiabili
+    macchine = [ProfiloMacchina("A", {1: 10, 2: 8}), ProfiloMacchina("B", {1: 20, 2: 12}),
+                ProfiloMacchina("C", {1: 20, 2: 8})]
+    rng = random.Random(0)
+    for _ in range(100):
+        lavori = lavori_piccoli(6, rng)
+        assert pianifica_esatto(lavori, macchine) == pytest.approx(makespan_forza_bruta(lavori, macchine), abs=1e-9)
+
+@pytest.mark.parametrize("seme", range(5))
+def test_esatto_uguale_alla_forza_bruta(seme):
+    rng = random.Random(seme)
+    for macchine in (macchine_esempio(), macchine_miste(rng), macchine_miste(rng)):
+        for _ in range(10):
+            lavori = lavori_piccoli(6, rng)
+            assert pianifica_esatto(lavori, macchine) == pytest.approx(makespan_forza_bruta(lavori, macchine), abs=1e-9)
+
+def test_euristica_non_migliore_dell_ottimo():
+    rng = random.Random(3); macchine = macchine_esempio()
+    for _ in range(20):
+        lavori = lavori_piccoli(7, rng)
+        piano = pianifica_produzione(lavori, macchine)
+        assert piano["makespan_h"] >= pianifica_esatto(lavori, macchine) - 1e-9
+        assert sorted(lav.id for righe in piano["macchine"].values() for lav, _, _ in righe) == list(range(7))
+
+def test_cli_pianifica_catalogo_non_prezzato_con_scadenze(tmp_path, capsys, genera_lavori, scrivi_lavori):
+    cat = tmp_path / "lavori.pk4c"; scrivi_lavori(cat, genera_lavori(40, seme=5, mm=(100, 800), max_quantita=20))
+    scadenze = tmp_path / "scadenze.csv"
+    scadenze.write_text("riga;scadenza_h\n0;0,01\n1;1000\n", encoding="utf-8")
+    assert cli.main(["pianifica", str(cat), "--scadenze", str(scadenze)]) == 0
+    out = capsys.readouterr().out
+    assert "Makespan" in out and "Lavori in ritardo: 1" in out and "righe: 0" in out
+    assert cli.main(["pianifica", str(cat)]) == 0
+    assert "in ritardo" not in capsys.readouterr().out
+
+def test_scadenze_e_ritardi():
+    rng = random.Random(7); macchine = macchine_esempio(); lavori = lavori_piccoli(30, rng)
+    for lav in lavori: lav.scadenza_h = rng.choice((None, 1.0, 3.0))
+    piano = pianifica_produzione(lavori, macchine)
+    in_ritardo, ritardo_max = ritardi_piano(piano["macchine"])
+    assert in_ritardo == len(piano["in_ritardo"])
+    # l'euristica non fa peggio del riferimento in ordine di arrivo sul ritardo massimo
+    assert ritardo_max <= ritardi_piano(pianifica_in_arrivo(lavori, macchine))[1] + 1e-9
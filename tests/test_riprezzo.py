@@ -0,0 +1,28 @@
+import pytest
+
+from pk4 import COLONNE_TABELLA, TabellaPreventivi, formatta_impatto, riprezza_tabella
+
+@pytest.mark.parametrize("modifiche", [
+    {"costo_W_litro": 250.0},
+    {"costo_C_litro": 90.0},
+    {"consumo_CMYK_mq": 0.007, "investimento_mq": 2.0},
+    {"consumo_W_mq": 0.02},
+    {"costo_orario_prestampa": 30.0},
+    {"costo_M_litro": 1.0, "volume_annuo_mq": 5.0},
+])
+def test_riprezzo_uguale_al_ricalcolo_completo(modifiche, parametri, genera_lavori):
+    lavori = genera_lavori(2000, seme=1)
+    tab = TabellaPreventivi.calcola(parametri, lavori)
+    nuovi = dict(parametri, **modifiche)
+    impatto = riprezza_tabella(tab, parametri, nuovi)
+    rif = TabellaPreventivi.calcola(nuovi, lavori)
+    for nome, _ in COLONNE_TABELLA:
+        assert list(tab.colonna(nome)) == list(rif.colonna(nome)), nome
+    assert impatto["totale_dopo"] == pytest.approx(rif.somma("totale_commessa"), rel=1e-12)
+    assert impatto["totale_prima"] == pytest.approx(TabellaPreventivi.calcola(parametri, lavori).somma("totale_commessa"), rel=1e-12)
+    assert formatta_impatto(impatto)
+
+def test_parametri_senza_effetto_non_toccano_le_colonne(parametri, genera_lavori):
+    tab = TabellaPreventivi.calcola(parametri, genera_lavori(100, seme=1))
+    impatto = riprezza_tabella(tab, parametri, dict(parametri, costo_Y_litro=1.0))
+    assert impatto["componenti"] == {} and impatto["delta"] == 0.0
@@ -0,0 +1,24 @@
+import pytest
+
+from pk4 import CAMPI_RISULTATO, TabellaPreventivi, breakdown_costo, preventivo
+
+def test_preventivo_uguale_a_breakdown(parametri, genera_lavori):
+    for lav in genera_lavori(500):
+        d = breakdown_costo(parametri, *lav); p = preventivo(parametri, *lav)
+        assert {k: p[k] for k in CAMPI_RISULTATO} == d
+
+def test_tabella_righe_e_slice_senza_copia(parametri, genera_lavori):
+    lavori = genera_lavori(200)
+    tab = TabellaPreventivi.calcola(parametri, lavori)
+    for i, lav in enumerate(lavori):
+        assert tab[i].as_dict() == breakdown_costo(parametri, *lav)
+    vista = tab[10:20]
+    assert len(vista) == 10 and vista[0]["area_mq"] == tab[10]["area_mq"]
+    assert vista.colonna("area_mq").obj is tab.colonna("area_mq").obj
+
+def test_quantita_frazionaria_rifiutata(parametri):
+    with pytest.raises(ValueError):
+        preventivo(parametri, 100, 100, 2.5, 1, 0)
+    with pytest.raises(ValueError):
+        TabellaPreventivi.calcola(parametri, [(100, 100, 2.5, 1, 0)])
+    assert preventivo(parametri, 100, 100, 3.0, 1, 0)["totale_commessa"] == breakdown_costo(parametri, 100, 100, 3, 1, 0)["totale_commessa"]